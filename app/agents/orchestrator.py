@@ -1,22 +1,73 @@
 # app/agents/orchestrator.py
 from langgraph.graph import StateGraph  # Updated import
-from typing import TypedDict, List, Dict
+from typing import Any, Callable, TypedDict, List, Dict, Optional, Tuple
 from langchain.docstore.document import Document
 from app.agents.retriever import RetrieverAgent
 from app.agents.responder import ResponderAgent
+from app.config import settings
+from app.services.tracing import span
+import asyncio
+import inspect
 import logging
+import time
+
+# Extra time the whole pipeline gets past the deadline, so the respond node's
+# own fallback (which still has the retrieved documents) wins the race
+_FALLBACK_GRACE_S = 0.1
+
+class DeadlineExceeded(Exception):
+    """Raised by a pipeline stage that starts with no time budget left."""
 
 class AgentState(TypedDict):
     """State representation for the agent workflow.
     
     Attributes:
         query: The user's original query string
+        catalog_id: Catalog to search (None for the default catalog)
+        user_id: Caller, used for fair LLM scheduling across users
+        priority: LLM scheduling class, "interactive" or "batch"
+        deadline: Absolute time.monotonic() value by which the answer is due
         documents: List of retrieved documents
         response: Generated response from the LLM
+        degraded: True when the response is a fallback produced after the deadline
     """
     query: str
+    catalog_id: Optional[str]
+    user_id: Optional[str]
+    priority: str
+    deadline: float
     documents: List[Document]
     response: str
+    degraded: bool
+
+class DirectExecutor:
+    """Runs a linear chain of node functions without LangGraph.
+
+    Exposes the same ``ainvoke`` interface as a compiled graph but keeps the
+    state in a plain dict and merges each node's update into it, skipping
+    LangGraph's channel, checkpoint and callback machinery. Sync nodes run in
+    a worker thread, like LangGraph does, so they never block the event loop.
+    """
+
+    def __init__(self, nodes: List[Tuple[str, Callable]]):
+        """Initialize the executor.
+
+        Args:
+            nodes: (name, function) pairs, executed in order
+        """
+        self.nodes = dict(nodes)
+        self._is_async = {name: inspect.iscoroutinefunction(node) for name, node in nodes}
+
+    async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Run every node in order and return the final state."""
+        state = dict(state)
+        for name, node in self.nodes.items():
+            if self._is_async[name]:
+                update = await node(state)
+            else:
+                update = await asyncio.to_thread(node, state)
+            state.update(update)
+        return state
 
 class Orchestrator:
     """Coordinates the multi-agent RAG workflow using LangGraph.
@@ -27,24 +78,35 @@ class Orchestrator:
     3. Handles error cases and logging
     """
     
-    def __init__(self, retriever: RetrieverAgent, responder: ResponderAgent):
+    def __init__(self, retriever: RetrieverAgent, responder: ResponderAgent, executor: Optional[str] = None):
         """Initialize the Orchestrator with agent dependencies.
         
         Args:
             retriever: Initialized RetrieverAgent instance
             responder: Initialized ResponderAgent instance
+            executor: "langgraph" or "direct" (defaults to ORCHESTRATOR_EXECUTOR)
         """
         self.retriever = retriever
         self.responder = responder
+        self.executor = executor or settings.ORCHESTRATOR_EXECUTOR
         self.logger = logging.getLogger(__name__)
         self.workflow = self._create_workflow()
 
-    def _create_workflow(self) -> StateGraph:
-        """Construct and configure the LangGraph state machine.
+    def _create_workflow(self):
+        """Construct and configure the workflow for the configured executor.
         
         Returns:
-            Configured StateGraph ready for execution
+            Compiled LangGraph StateGraph, or a DirectExecutor running the
+            same nodes for the "direct" executor
         """
+        if self.executor == "direct":
+            return DirectExecutor([
+                ("retrieve", self._retrieve_documents),
+                ("respond", self._generate_response)
+            ])
+        if self.executor != "langgraph":
+            raise ValueError(f"Unknown orchestrator executor '{self.executor}'")
+
         workflow = StateGraph(AgentState)  # Updated to StateGraph
 
         # Add nodes to the workflow
@@ -60,30 +122,64 @@ class Orchestrator:
         
         return workflow.compile()
 
-    async def process_query(self, query: str) -> Dict[str, any]:
+    async def process_query(
+        self,
+        query: str,
+        timeout_ms: Optional[int] = None,
+        catalog_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        priority: str = "interactive"
+    ) -> Dict[str, any]:
         """Execute the full RAG pipeline for a user query.
         
         Args:
             query: User's natural language question
+            catalog_id: Catalog to search (defaults to the default catalog)
+            timeout_ms: Time budget for the request (defaults to REQUEST_TIMEOUT_MS)
+            user_id: Caller, used for fair LLM scheduling across users
+            priority: LLM scheduling class, "interactive" or "batch"
             
         Returns:
             Dictionary containing:
             - response: Generated answer
             - sources: List of source documents used
+            - degraded: Present and True when the deadline forced a fallback answer
             - error: Optional error message
         """
+        timeout_s = (timeout_ms or settings.REQUEST_TIMEOUT_MS) / 1000
         try:
-            result = await self.workflow.ainvoke({"query": query})
+            result = await asyncio.wait_for(
+                self.workflow.ainvoke({
+                    "query": query,
+                    "catalog_id": catalog_id,
+                    "user_id": user_id,
+                    "priority": priority,
+                    "deadline": time.monotonic() + timeout_s
+                }),
+                timeout=timeout_s + _FALLBACK_GRACE_S
+            )
         
-            return {
+            output = {
                 "response": result["response"],
                 "sources": [
                     {
-                        "source_name": doc.metadata.get("source", "unknown")
+                        "source_name": source_name
                     }
                     for doc in result["documents"]
+                    # Collapsed near-duplicates carry every source they stand for
+                    for source_name in doc.metadata.get("sources") or [doc.metadata.get("source", "unknown")]
                 ]
             }
+            if result.get("degraded"):
+                output["degraded"] = True
+            return output
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            self.logger.warning(f"Request deadline of {timeout_s * 1000:.0f}ms exceeded, returning fallback")
+            return {
+                "response": self.responder.degraded_response(query, []),
+                "sources": [],
+                "degraded": True
+            }
         except Exception as e:
             self.logger.error(f"Pipeline execution failed: {str(e)}", exc_info=True)
             return {
@@ -99,23 +195,61 @@ class Orchestrator:
             
         Returns:
             Dictionary with key "documents" containing retrieved docs
+
+        Raises:
+            DeadlineExceeded: If the request has no time budget left
         """
-        documents = self.retriever.retrieve(state["query"])
+        remaining = self._remaining_budget(state)
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("No time budget left for retrieval")
+        with span("node.retrieve"):
+            documents = self.retriever.retrieve(state["query"], state.get("catalog_id"))
         self.logger.debug(f"Retrieved {len(documents)} documents")
         return {"documents": documents}
 
-    def _generate_response(self, state: AgentState) -> Dict[str, str]:
+    async def _generate_response(self, state: AgentState) -> Dict[str, str]:
         """Generate LLM response based on retrieved documents.
         
+        The LLM call gets whatever budget is left; if the deadline passes it
+        is cancelled and an extractive fallback built from the retrieved
+        documents is returned instead.
+
         Args:
             state: Current workflow state containing query and documents
             
         Returns:
-            Dictionary with key "response" containing generated answer
+            Dictionary with key "response" containing generated answer;
+            when the fallback was used, also "degraded" and "documents"
+            narrowed to the document it quotes, so only that one is cited
         """
-        response = self.responder.generate_response(
-            state["query"],
-            state["documents"]
-        )
+        remaining = self._remaining_budget(state)
+        with span("node.respond"):
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await asyncio.wait_for(
+                    self.responder.agenerate_response(
+                        state["query"],
+                        state["documents"],
+                        user_id=state.get("user_id"),
+                        priority=state.get("priority") or "interactive"
+                    ),
+                    timeout=remaining
+                )
+            except asyncio.TimeoutError:
+                self.logger.warning("Deadline reached before the LLM answered, returning fallback")
+                return {
+                    "response": self.responder.degraded_response(state["query"], state["documents"]),
+                    "degraded": True,
+                    # The fallback quotes the top document only
+                    "documents": state["documents"][:1]
+                }
         self.logger.debug(f"Generated response: {response[:100]}...")
-        return {"response": response}
\ No newline at end of file
+        return {"response": response}
+
+    def _remaining_budget(self, state: AgentState) -> Optional[float]:
+        """Seconds left before the request deadline, or None without a deadline."""
+        deadline = state.get("deadline")
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
\ No newline at end of file
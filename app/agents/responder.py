@@ -1,14 +1,18 @@
 # app/agents/responder.py
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from langchain.docstore.document import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from app.services.llm_service import LLMService
 from app.prompts.templates import format_context_with_sources
+from app.services.tracing import span
 import logging
 
+# Maximum length of the extractive snippet returned by the fallback answer
+_SNIPPET_CHARS = 400
+
 class ResponderAgent:
     """Agent responsible for generating natural language responses using LLM.
     
@@ -43,7 +47,8 @@ class ResponderAgent:
             return {
                 "system": (prompt_dir / "system.md").read_text(encoding="utf-8"),
                 "no_context": (prompt_dir / "no_context.md").read_text(encoding="utf-8"),
-                "error": (prompt_dir / "error.md").read_text(encoding="utf-8")
+                "error": (prompt_dir / "error.md").read_text(encoding="utf-8"),
+                "degraded": (prompt_dir / "degraded.md").read_text(encoding="utf-8")
             }
         except FileNotFoundError as e:
             self.logger.error(f"Prompt files not found: {e}")
@@ -71,6 +76,9 @@ class ResponderAgent:
 
     def generate_response(self, query: str, context_docs: List[Document]) -> str:
         """Generate response based on user query and retrieved documents.
+
+        Calls the LLM directly, outside the LLM scheduler; request handling
+        and warm-up use ``agenerate_response``.
         
         Args:
             query: User's natural language question
@@ -79,28 +87,101 @@ class ResponderAgent:
         Returns:
             Generated response string
         """
-        if not query.strip():
-            return self._handle_empty_query()
+        early_response = self._early_response(query, context_docs)
+        if early_response is not None:
+            return early_response
             
-        if not context_docs:
-            return self.prompts["no_context"].format(query=query)
+        try:
+            with span("llm", documents=len(context_docs)):
+                return self.response_chain.invoke({
+                    "query": query,
+                    "context": context_docs
+                })
+        except Exception as e:
+            self.logger.error(f"Response generation failed: {str(e)}")
+            return self.prompts["error"]
+
+    async def agenerate_response(
+        self,
+        query: str,
+        context_docs: List[Document],
+        user_id: Optional[str] = None,
+        priority: str = "interactive"
+    ) -> str:
+        """Async variant of generate_response.
+
+        The LLM request waits for a slot of the LLM service's scheduler and is
+        then awaited, so cancelling the calling task (e.g. when the request
+        deadline passes) either leaves the queue or aborts the in-flight call.
+
+        Args:
+            query: User's natural language question
+            context_docs: List of relevant documents retrieved
+            user_id: Caller, used for fair queueing across users
+            priority: Scheduling class, "interactive" or "batch"
             
+        Returns:
+            Generated response string
+        """
+        early_response = self._early_response(query, context_docs)
+        if early_response is not None:
+            return early_response
+
         try:
-            return self.response_chain.invoke({
-                "query": query,
-                "context": context_docs
-            })
+            scheduler = self.llm_service.scheduler
+            with span("llm.queue", priority=priority):
+                await scheduler.acquire(user_id, priority)
+            try:
+                with span("llm", documents=len(context_docs)):
+                    return await self.response_chain.ainvoke({
+                        "query": query,
+                        "context": context_docs
+                    })
+            finally:
+                scheduler.release(priority)
         except Exception as e:
             self.logger.error(f"Response generation failed: {str(e)}")
             return self.prompts["error"]
+
+    def degraded_response(self, query: str, context_docs: List[Document]) -> str:
+        """Build a fallback answer without calling the LLM.
+
+        Args:
+            query: User's natural language question
+            context_docs: Retrieved documents, best match first (may be empty)
+            
+        Returns:
+            The top extractive snippet with its source, or the error prompt
+            when nothing was retrieved
+        """
+        if not context_docs:
+            return self.prompts["error"]
+        top_doc = context_docs[0]
+        snippet = " ".join(top_doc.page_content.split())
+        if len(snippet) > _SNIPPET_CHARS:
+            snippet = snippet[:_SNIPPET_CHARS].rsplit(" ", 1)[0] + "..."
+        return self.prompts["degraded"].format(
+            snippet=snippet,
+            source=top_doc.metadata.get("source", "unknown")
+        )
+
+    def _early_response(self, query: str, context_docs: List[Document]):
+        """Return a canned response when the LLM does not need to be called."""
+        if not query.strip():
+            return self._handle_empty_query()
+            
+        if not context_docs:
+            return self.prompts["no_context"].format(query=query)
+        return None
         
     def _format_context(self, docs: List[Document]) -> str:
         """Formatea los documentos conservando sus metadatos."""
         formatted_context = []
         for doc in docs.get("context"):
             # Asegúrate de incluir el contenido y los metadatos
+            sources = doc.metadata.get("sources") or [doc.metadata.get('source', 'unknown')]
             formatted_context.append(
-                f"Contenido: {doc.page_content}\nFuente: {doc.metadata.get('source', 'unknown')}"
+                f"Contenido: {doc.page_content}\nFuente: {', '.join(sources)}"
             )
         return "\n\n".join(formatted_context)
 
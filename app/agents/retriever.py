@@ -1,17 +1,33 @@
 # app/agents/retriever.py
-from typing import List
+from typing import List, Optional
 from langchain.docstore.document import Document
 from app.services.vector_store import VectorStoreService
-from langchain_core.runnables import RunnableLambda
+from app.services.catalog_registry import CatalogRegistry
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+import time
 
 class RetrieverAgent:
-    def __init__(self, vector_store: VectorStoreService):
+    def __init__(
+        self,
+        vector_store: VectorStoreService,
+        catalogs: Optional[CatalogRegistry] = None,
+        direct: bool = False,
+        mmr_lambda: Optional[float] = None
+    ):
         """Initialize the RetrieverAgent with a vector store service.
         
         Args:
-            vector_store: Initialized VectorStoreService instance
+            vector_store: Initialized VectorStoreService instance (default catalog)
+            catalogs: Optional registry used to route queries to other catalogs
+            direct: Call the pipeline steps directly instead of through the
+                Runnable chain (same result, no Runnable/callback overhead)
+            mmr_lambda: When set, diversify results by maximal marginal
+                relevance with this relevance/diversity trade-off
         """
         self.vector_store = vector_store
+        self.catalogs = catalogs
+        self.direct = direct
+        self.mmr_lambda = mmr_lambda
         self._setup_pipeline()
         
     def _setup_pipeline(self):
@@ -28,32 +44,53 @@ class RetrieverAgent:
             | RunnableLambda(self._rerank_docs)
         )
 
-    def _retrieve_docs(self, query: str) -> List[Document]:
+    def _retrieve_docs(self, query: str, config: RunnableConfig) -> List[Document]:
         """Retrieve documents from the vector store for a given query.
         
         Args:
             query: Preprocessed search query
+            config: Runnable config; ``configurable.catalog_id`` selects the catalog
             
         Returns:
             List of relevant documents with scores in metadata
         """
-        return self.vector_store.search(query)
+        catalog_id = config.get("configurable", {}).get("catalog_id")
+        store = self._store_for(catalog_id)
+        if self.mmr_lambda is not None:
+            return store.search_mmr(query, lambda_mult=self.mmr_lambda)
+        return store.search(query)
+
+    def _store_for(self, catalog_id: Optional[str]) -> VectorStoreService:
+        """Return the vector store serving a catalog."""
+        if catalog_id is None or self.catalogs is None:
+            return self.vector_store
+        return self.catalogs.get(catalog_id)
     
-    def retrieve(self, query: str) -> List[Document]:
+    def retrieve(self, query: str, catalog_id: Optional[str] = None) -> List[Document]:
         """Main interface for document retrieval.
         
         Args:
             query: User's search query
+            catalog_id: Catalog to search (defaults to the default catalog)
             
         Returns:
             List of reranked relevant documents
             
         Raises:
             ValueError: If query is empty or whitespace-only
+            CatalogNotFound: If the catalog does not exist
         """
         if not query or not query.strip():
             raise ValueError("Query cannot be empty")
-        return self.search_chain.invoke(query)
+        start = time.perf_counter()
+        config = {"configurable": {"catalog_id": catalog_id}}
+        if self.direct:
+            documents = self._rerank_docs(self._retrieve_docs(self._preprocess_query(query), config))
+        else:
+            documents = self.search_chain.invoke(query, config=config)
+        if self.catalogs is not None:
+            self.catalogs.record_latency(catalog_id, (time.perf_counter() - start) * 1000)
+        return documents
     
     def _preprocess_query(self, query: str) -> str:
         """Normalize and clean the search query.
@@ -10,8 +10,52 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
     TOP_K: int = int(os.getenv("TOP_K", 3))
+    MMR_ENABLED: bool = os.getenv("MMR_ENABLED", "false").lower() == "true"
+    MMR_LAMBDA: float = float(os.getenv("MMR_LAMBDA", 0.5))
+    MMR_FETCH_K: int = int(os.getenv("MMR_FETCH_K", 20))
     MAX_RETRY: int = int(os.getenv("MAX_RETRY", 3))
+    ORCHESTRATOR_EXECUTOR: str = os.getenv("ORCHESTRATOR_EXECUTOR", "langgraph")
+    REQUEST_TIMEOUT_MS: int = int(os.getenv("REQUEST_TIMEOUT_MS", 15000))
+    LLM_TIMEOUT_S: float = float(os.getenv("LLM_TIMEOUT_S", 30))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_BATCH_MAX_CONCURRENCY: int = int(os.getenv("LLM_BATCH_MAX_CONCURRENCY", 6))
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", "data/vector_store.index")
+    VECTOR_STORE_SHARDS: int = int(os.getenv("VECTOR_STORE_SHARDS", 1))
+    SHARD_KEY: str = os.getenv("SHARD_KEY", "source")
+    CATALOGS_DIR: str = os.getenv("CATALOGS_DIR", "data/catalogs")
+    CATALOG_MEMORY_BUDGET_MB: int = int(os.getenv("CATALOG_MEMORY_BUDGET_MB", 1024))
+    INDEX_REDUCTION: str = os.getenv("INDEX_REDUCTION", "none")
+    INDEX_REDUCED_DIM: int = int(os.getenv("INDEX_REDUCED_DIM", 128))
+    INDEX_QUANTIZATION: str = os.getenv("INDEX_QUANTIZATION", "none")
+    INDEX_MMAP: bool = os.getenv("INDEX_MMAP", "true").lower() == "true"
+    INGEST_WAL_PATH: str = os.getenv("INGEST_WAL_PATH", "data/ingest.wal")
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", 64))
+    INGEST_BATCH_WAIT_MS: int = int(os.getenv("INGEST_BATCH_WAIT_MS", 200))
+    INGEST_COMPACTION_INTERVAL_S: float = float(os.getenv("INGEST_COMPACTION_INTERVAL_S", 300))
+    INGEST_MAX_RETRIES: int = int(os.getenv("INGEST_MAX_RETRIES", 3))
+    INGEST_RETRY_BACKOFF_S: float = float(os.getenv("INGEST_RETRY_BACKOFF_S", 0.5))
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", 0.85))
+    DEDUP_NUM_PERM: int = int(os.getenv("DEDUP_NUM_PERM", 128))
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", 1024))
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", 1024))
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", 10000))
+    CACHE_MEMORY_BUDGET_MB: int = int(os.getenv("CACHE_MEMORY_BUDGET_MB", 256))
+    QUERY_LOG_PATH: str = os.getenv("QUERY_LOG_PATH", "data/query_log.jsonl")
+    WARMUP_TOP_N: int = int(os.getenv("WARMUP_TOP_N", 50))
+    WARMUP_TIME_BUDGET_S: float = float(os.getenv("WARMUP_TIME_BUDGET_S", 30))
+    WARMUP_ANSWERS: bool = os.getenv("WARMUP_ANSWERS", "false").lower() == "true"
+    WARMUP_REPORT_WINDOW_S: float = float(os.getenv("WARMUP_REPORT_WINDOW_S", 300))
+    SLOW_REQUEST_THRESHOLD_MS: float = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 2000))
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", 100))
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+    CAPTURE_ENABLED: bool = os.getenv("CAPTURE_ENABLED", "true").lower() == "true"
+    CAPTURE_DIR: str = os.getenv("CAPTURE_DIR", "data/capture")
+    CAPTURE_QUEUE_SIZE: int = int(os.getenv("CAPTURE_QUEUE_SIZE", 10000))
+    CAPTURE_BATCH_SIZE: int = int(os.getenv("CAPTURE_BATCH_SIZE", 500))
+    CAPTURE_FLUSH_INTERVAL_S: float = float(os.getenv("CAPTURE_FLUSH_INTERVAL_S", 1.0))
+    CAPTURE_MAX_FILE_MB: int = int(os.getenv("CAPTURE_MAX_FILE_MB", 64))
+    CAPTURE_COMPRESS: bool = os.getenv("CAPTURE_COMPRESS", "true").lower() == "true"
   
   
 
@@ -1,21 +1,144 @@
 # app/main.py
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query, Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+import asyncio
 import logging
+import os
 import time
+from app.config import settings
 from app.services.vector_store import VectorStoreService
+from app.services.catalog_registry import CatalogRegistry, CatalogNotFound
 from app.services.llm_service import LLMService
+from app.services.memory import MemoryManager, model_bytes
+from app.services.query_log import QueryLog
+from app.services.ingestion import IngestionService, WriteAheadLog
+from app.services.warmup import CacheWarmer
+from app.services.capture import CaptureLog, response_hash
+from app.services.tracing import SlowRequestTracer
 from app.agents.retriever import RetrieverAgent
 from app.agents.responder import ResponderAgent
 from app.agents.orchestrator import Orchestrator
 
 # Initialize services and agents
 vector_store = VectorStoreService()
+memory = MemoryManager(settings.CACHE_MEMORY_BUDGET_MB * 2**20)
+
+
+def _catalog_store(path: str) -> VectorStoreService:
+    """Build a catalog store sharing the default embedding model and cache budget."""
+    store = VectorStoreService(
+        embeddings=vector_store.embeddings,
+        index_path=path,
+        mmap=settings.INDEX_MMAP
+    )
+    catalog_id = os.path.basename(os.path.dirname(path))
+    for cache in (store.embedding_cache, store.search_cache):
+        # Held weakly: the caches leave the budget when the catalog is evicted
+        memory.attach(cache, name=f"{catalog_id}:{cache.name}")
+    return store
+
+
+catalogs = CatalogRegistry(
+    default_store=vector_store,
+    store_factory=_catalog_store,
+    catalogs_dir=settings.CATALOGS_DIR,
+    memory_budget_bytes=settings.CATALOG_MEMORY_BUDGET_MB * 2**20
+)
 llm_service = LLMService()
-retriever = RetrieverAgent(vector_store)
+retriever = RetrieverAgent(
+    vector_store,
+    catalogs,
+    direct=settings.ORCHESTRATOR_EXECUTOR == "direct",
+    mmr_lambda=settings.MMR_LAMBDA if settings.MMR_ENABLED else None
+)
 responder = ResponderAgent(llm_service)
 orchestrator = Orchestrator(retriever, responder)
+memory.register("vector_store", vector_store.estimated_bytes)
+memory.register("embedding_model", lambda: model_bytes(vector_store.embeddings))
+memory.register("catalogs", catalogs.used_bytes)
+memory.register("vector_store", vector_store.mapped_bytes, mapped=True)
+memory.register("catalogs", catalogs.mapped_bytes, mapped=True)
+for cache in (vector_store.embedding_cache, vector_store.search_cache, llm_service.cache.entries):
+    memory.attach(cache)
+query_log = QueryLog(settings.QUERY_LOG_PATH)
+ingestion = IngestionService(
+    vector_store,
+    WriteAheadLog(settings.INGEST_WAL_PATH),
+    batch_size=settings.INGEST_BATCH_SIZE,
+    batch_wait_s=settings.INGEST_BATCH_WAIT_MS / 1000,
+    compaction_interval_s=settings.INGEST_COMPACTION_INTERVAL_S,
+    max_retries=settings.INGEST_MAX_RETRIES,
+    retry_backoff_s=settings.INGEST_RETRY_BACKOFF_S
+)
+tracer = SlowRequestTracer(
+    threshold_ms=settings.SLOW_REQUEST_THRESHOLD_MS,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+    sample_rate=settings.TRACE_SAMPLE_RATE
+)
+capture = CaptureLog(
+    settings.CAPTURE_DIR,
+    max_queue=settings.CAPTURE_QUEUE_SIZE,
+    batch_size=settings.CAPTURE_BATCH_SIZE,
+    flush_interval_s=settings.CAPTURE_FLUSH_INTERVAL_S,
+    max_file_bytes=settings.CAPTURE_MAX_FILE_MB * 2**20,
+    compress=settings.CAPTURE_COMPRESS
+) if settings.CAPTURE_ENABLED else None
+cache_report = {"warmup": None, "post_deploy": None}
+
+
+async def _report_post_deploy_hit_rate(baseline: List[dict]):
+    """Log and keep the cache hit rate observed in the first minutes after startup.
+
+    Counters are diffed against the snapshot taken right after warm-up so the
+    warm-up lookups themselves are not counted.
+    """
+    await asyncio.sleep(settings.WARMUP_REPORT_WINDOW_S)
+    caches = []
+    for before, after in zip(baseline, vector_store.cache_stats()):
+        hits = after["hits"] - before["hits"]
+        misses = after["misses"] - before["misses"]
+        caches.append({
+            "name": after["name"],
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None
+        })
+    cache_report["post_deploy"] = {
+        "window_s": settings.WARMUP_REPORT_WINDOW_S,
+        "caches": caches
+    }
+    logging.info(f"Post-deploy cache hit rate: {cache_report['post_deploy']}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Replay pending document changes, warm caches from the query history
+    before accepting traffic, and snapshot the index and flush the request
+    capture on shutdown."""
+    vector_store.load_index()
+    ingestion.start()
+    query_log.load()
+    query_log.start()
+    warmer = CacheWarmer(query_log, retriever, responder)
+    try:
+        cache_report["warmup"] = await warmer.warm(
+            settings.WARMUP_TOP_N,
+            settings.WARMUP_TIME_BUDGET_S,
+            settings.WARMUP_ANSWERS
+        )
+    except Exception as e:
+        logging.error(f"Cache warm-up failed: {str(e)}", exc_info=True)
+    report_task = asyncio.create_task(_report_post_deploy_hit_rate(vector_store.cache_stats()))
+    if capture is not None:
+        await capture.start()
+    yield
+    report_task.cancel()
+    if capture is not None:
+        await capture.stop()
+    await asyncio.to_thread(query_log.stop)
+    await asyncio.to_thread(ingestion.stop)
 
 
 app = FastAPI(
@@ -30,7 +153,14 @@ app = FastAPI(
     openapi_tags=[{
         "name": "queries",
         "description": "Product information retrieval endpoints"
-    }]
+    }, {
+        "name": "documents",
+        "description": "Live document ingestion endpoints"
+    }, {
+        "name": "admin",
+        "description": "Operational endpoints"
+    }],
+    lifespan=lifespan
 )
 
 class QueryRequest(BaseModel):
@@ -47,6 +177,52 @@ class QueryRequest(BaseModel):
         example="What products have extended warranty?",
         description="Natural language question about products"
     )
+    catalog_id: Optional[str] = Field(
+        None,
+        pattern=r"^[A-Za-z0-9_-]{1,64}$",
+        example="partner_acme",
+        description="Retail partner catalog to search; omitted means the default catalog"
+    )
+    timeout_ms: Optional[int] = Field(
+        None,
+        ge=100,
+        le=60000,
+        example=5000,
+        description="Time budget for the answer; when it runs out a degraded answer is returned"
+    )
+    priority: str = Field(
+        "interactive",
+        pattern=r"^(interactive|batch)$",
+        example="interactive",
+        description="LLM scheduling class; bulk jobs should send 'batch'"
+    )
+
+class DocumentUpload(BaseModel):
+    """Request model for adding or replacing a product document"""
+    source: str = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        pattern=r"^[^/\\]+$",
+        example="x3_specs.txt",
+        description="Unique document name; uploading an existing source replaces it"
+    )
+    content: str = Field(
+        ...,
+        min_length=1,
+        example="Product: ActivePro X3 Smartwatch...",
+        description="Document text"
+    )
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        example={"category": "wearables"},
+        description="Extra metadata stored with the document"
+    )
+
+class IngestionAccepted(BaseModel):
+    """Acknowledgement of a logged document change"""
+    status: str = Field(default="accepted")
+    seq: int = Field(..., description="Write-ahead log sequence number of the change")
 
 class SourceDocument(BaseModel):
     """Metadata about retrieved source documents"""
@@ -59,6 +235,10 @@ class QueryResponse(BaseModel):
     sources: List[SourceDocument]
     processing_time_ms: Optional[float]
     model_version: str = Field(default="v1.0")
+    degraded: bool = Field(
+        default=False,
+        description="True when the deadline forced a fallback answer instead of a full LLM response"
+    )
 
 @app.post(
     "/query",
@@ -77,7 +257,8 @@ class QueryResponse(BaseModel):
                             {"source_name": "x3_specs.pdf"}
                         ],
                         "processing_time_ms": 423.1,
-                        "model_version": "v1.0"
+                        "model_version": "v1.0",
+                        "degraded": False
                     }
                 }
             }
@@ -90,6 +271,14 @@ class QueryResponse(BaseModel):
                 }
             }
         },
+        404: {
+            "description": "Unknown catalog",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Catalog 'partner_acme' not found"}
+                }
+            }
+        },
         500: {
             "description": "Internal processing error",
             "content": {
@@ -130,9 +319,24 @@ async def handle_query(
     
     Rate Limit: 5 requests/minute per user
     """
+    try:
+        # Loads the catalog on first use (outside the event loop) and rejects unknown ids
+        await asyncio.to_thread(catalogs.get, request.catalog_id)
+    except CatalogNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
     try:
         start_time = time.time()
-        result = await orchestrator.process_query(request.query)
+        with tracer.trace(
+            "POST /query", user_id=request.user_id, catalog_id=request.catalog_id, query=request.query[:100]
+        ) as trace:
+            result = await orchestrator.process_query(
+                request.query,
+                timeout_ms=request.timeout_ms,
+                catalog_id=request.catalog_id,
+                user_id=request.user_id,
+                priority=request.priority
+            )
    
         
         if "error" in result:
@@ -140,13 +344,163 @@ async def handle_query(
         
         sources = [{"source_name": source} if isinstance(source, str) else source 
                   for source in result.get("sources", [])]
+        # Buffered in memory; written by the query log's background thread
+        query_log.record(request.query, request.user_id, request.catalog_id)
+        processing_time_ms = (time.time() - start_time) * 1000
+        if capture is not None:
+            # Enqueue only; dropped (and counted) if the writer falls behind
+            capture.record(
+                ts=start_time,
+                query=request.query,
+                user_id=request.user_id,
+                catalog_id=request.catalog_id,
+                priority=request.priority,
+                timeout_ms=request.timeout_ms,
+                sources=[source["source_name"] for source in sources],
+                timings={"total_ms": round(processing_time_ms, 3), **(trace.stage_ms() if trace else {})},
+                response_hash=response_hash(result["response"]),
+                degraded=result.get("degraded", False)
+            )
         
         return {
             "user_id": request.user_id,
             "response": result["response"],
             "sources": sources,
-            "processing_time_ms": (time.time() - start_time) * 1000
+            "processing_time_ms": processing_time_ms,
+            "degraded": result.get("degraded", False)
         }
     except Exception as e:
         logging.error(f"Endpoint error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@app.post(
+    "/documents",
+    response_model=IngestionAccepted,
+    status_code=202,
+    tags=["documents"],
+    summary="Add or replace a product document"
+)
+async def upload_document(document: DocumentUpload):
+    """Log the document in the write-ahead log and return immediately.
+
+    The document is embedded and added to the live index by a background
+    worker within a few hundred milliseconds; queries are never blocked.
+    """
+    seq = await asyncio.to_thread(
+        ingestion.submit_upsert, document.source, document.content, document.metadata
+    )
+    return {"status": "accepted", "seq": seq}
+
+
+@app.delete(
+    "/documents/{source}",
+    response_model=IngestionAccepted,
+    status_code=202,
+    tags=["documents"],
+    summary="Delete a product document"
+)
+async def delete_document(source: str = Path(..., min_length=1, max_length=200)):
+    """Log the deletion of every chunk of a source and return immediately."""
+    seq = await asyncio.to_thread(ingestion.submit_delete, source)
+    return {"status": "accepted", "seq": seq}
+
+
+@app.get(
+    "/admin/ingestion",
+    tags=["admin"],
+    summary="Live ingestion status"
+)
+async def ingestion_stats():
+    """Report pending changes, applied and snapshotted sequence numbers."""
+    return ingestion.stats()
+
+
+@app.get(
+    "/admin/capture",
+    tags=["admin"],
+    summary="Request capture status"
+)
+async def capture_stats():
+    """Report queued, written and dropped capture records."""
+    if capture is None:
+        return {"enabled": False}
+    return {"enabled": True, **capture.stats()}
+
+
+@app.get(
+    "/admin/memory",
+    tags=["admin"],
+    summary="Memory usage by component"
+)
+async def memory_stats():
+    """Break down estimated memory by component and cache, with the shared cache budget."""
+    return await asyncio.to_thread(memory.report)
+
+
+@app.get(
+    "/admin/llm",
+    tags=["admin"],
+    summary="LLM scheduler status"
+)
+async def llm_scheduler_stats():
+    """Report concurrency limits, in-flight calls and queue wait per priority class."""
+    return llm_service.scheduler.stats()
+
+
+@app.get(
+    "/admin/cache",
+    tags=["admin"],
+    summary="Cache warm-up and hit-rate report"
+)
+async def cache_stats():
+    """Report the startup warm-up result, the hit rate over the first minutes
+    after deploy and the current cache counters."""
+    return {
+        "warmup": cache_report["warmup"],
+        "post_deploy": cache_report["post_deploy"],
+        "current": vector_store.cache_stats(),
+        "top_queries": query_log.top(10)
+    }
+
+
+@app.get(
+    "/admin/catalogs",
+    tags=["admin"],
+    summary="Catalog registry stats"
+)
+async def catalog_stats():
+    """Report loaded catalogs, memory budget usage, load/evict counts and
+    per-catalog retrieval latency."""
+    return catalogs.stats()
+
+
+@app.get(
+    "/admin/traces",
+    tags=["admin"],
+    summary="List captured slow-request traces"
+)
+async def list_traces():
+    """List traces of requests slower than SLOW_REQUEST_THRESHOLD_MS, newest first."""
+    return {
+        "threshold_ms": tracer.threshold_ms,
+        "sample_rate": tracer.sample_rate,
+        "traces": tracer.list()
+    }
+
+
+@app.get(
+    "/admin/traces/{trace_id}",
+    tags=["admin"],
+    summary="Get a slow-request trace"
+)
+async def get_trace(
+    trace_id: str,
+    format: str = Query("json", pattern="^(json|chrome)$", description="'chrome' exports the Chrome Trace Event format")
+):
+    """Return one trace, either as JSON spans or in the Chrome Trace Event format
+    (loadable in chrome://tracing or ui.perfetto.dev)."""
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.to_chrome_trace() if format == "chrome" else trace.to_dict()
@@ -0,0 +1,149 @@
+# app/services/cache.py
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+import heapq
+import itertools
+import threading
+from app.services.memory import estimate_size
+
+
+class LRUCache:
+    """Thread-safe LRU cache with hit/miss and memory accounting.
+
+    Used for query embeddings and retrieval results, which are looked up from
+    LangGraph worker threads as well as the warm-up job.
+
+    Entries beyond ``maxsize`` are evicted least recently used first. Each
+    entry's size is estimated on insert; once the cache is attached to a
+    MemoryManager it also gets a GreedyDual-Size priority so the manager can
+    evict across caches under a shared byte budget.
+    """
+
+    def __init__(self, maxsize: int, name: str = "cache", default_cost_ms: float = 1.0):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries (0 disables the cache)
+            name: Label used in stats and logs
+            default_cost_ms: Recompute cost assumed for entries stored without one
+        """
+        self.maxsize = maxsize
+        self.name = name
+        self.default_cost_ms = default_cost_ms
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self.memory = None
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._weights: Dict[Hashable, float] = {}
+        self._priorities: Dict[Hashable, float] = {}
+        # Lazy min-heap of (priority, seq, key); stale rows are skipped when popped
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, marking it as recently used."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._touch(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any, cost_ms: Optional[float] = None):
+        """Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            cost_ms: Time it took to compute the value (defaults to default_cost_ms)
+        """
+        if self.maxsize <= 0:
+            return
+        size = estimate_size(key) + estimate_size(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = value
+            self._sizes[key] = size
+            self._weights[key] = (cost_ms if cost_ms is not None else self.default_cost_ms) / size
+            self.bytes += size
+            self._touch(key)
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+        if self.memory is not None:
+            self.memory.enforce()
+
+    def _touch(self, key: Hashable):
+        """Refresh the GreedyDual-Size priority of an entry (lock held)."""
+        clock = self.memory.clock if self.memory is not None else 0.0
+        priority = clock + self._weights[key]
+        self._priorities[key] = priority
+        heapq.heappush(self._heap, (priority, next(self._seq), key))
+        if len(self._heap) > 4 * len(self._data) + 64:
+            self._heap = [(p, next(self._seq), k) for k, p in self._priorities.items()]
+            heapq.heapify(self._heap)
+
+    def _remove(self, key: Hashable):
+        """Drop an entry and its accounting (lock held)."""
+        del self._data[key]
+        self.bytes -= self._sizes.pop(key)
+        self._weights.pop(key)
+        self._priorities.pop(key)
+
+    def _pop_stale(self):
+        """Discard heap rows of removed or re-prioritized entries (lock held)."""
+        while self._heap:
+            priority, _, key = self._heap[0]
+            if self._priorities.get(key) == priority:
+                return
+            heapq.heappop(self._heap)
+
+    def min_priority(self) -> Optional[float]:
+        """Priority of the entry the cache would evict next, or None if empty."""
+        with self._lock:
+            self._pop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def evict_cheapest(self) -> Optional[float]:
+        """Evict the lowest-priority entry and return its priority."""
+        with self._lock:
+            self._pop_stale()
+            if not self._heap:
+                return None
+            priority, _, key = heapq.heappop(self._heap)
+            self._remove(key)
+            self.evictions += 1
+            return priority
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._weights.clear()
+            self._priorities.clear()
+            self._heap = []
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, memory and hit-rate counters."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,194 @@
+# app/services/capture.py
+from typing import Any, Dict, List, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+
+def response_hash(text: str) -> str:
+    """Short, stable fingerprint of a response (to compare replays)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class CaptureLog:
+    """Non-blocking capture of served requests to JSONL, for replay.
+
+    ``record`` only enqueues the record on a bounded in-memory queue and never
+    waits: when the queue is full the record is dropped and counted. A
+    background task drains the queue in batches and appends them to
+    ``<directory>/<basename>.jsonl`` from a worker thread. Once the file
+    reaches ``max_file_bytes`` it is rotated to a timestamped name and,
+    with ``compress``, gzipped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval_s: float = 1.0,
+        max_file_bytes: int = 64 * 2**20,
+        compress: bool = True,
+        basename: str = "requests"
+    ):
+        """Initialize the capture log.
+
+        Args:
+            directory: Folder receiving the capture files
+            max_queue: Records buffered in memory before new ones are dropped
+            batch_size: Maximum records written per flush
+            flush_interval_s: Longest time a record waits in the queue
+            max_file_bytes: Size at which the active file is rotated
+            compress: Gzip rotated files
+            basename: Name of the active file, without extension
+        """
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_file_bytes = max_file_bytes
+        self.compress = compress
+        self.path = os.path.join(directory, f"{basename}.jsonl")
+        self.logger = logging.getLogger(__name__)
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+        self.rotations = 0
+        self._basename = basename
+        # Replaced by start(): asyncio primitives bind to the first loop that waits on them
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, ts: Optional[float] = None, **fields) -> bool:
+        """Enqueue a record without blocking. Returns False if it was dropped.
+
+        Args:
+            ts: Arrival time of the request (defaults to now); replays pace by it
+            **fields: Record contents
+        """
+        try:
+            self._queue.put_nowait({"ts": time.time() if ts is None else ts, **fields})
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.recorded += 1
+        return True
+
+    async def start(self):
+        """Start the background flush task on the running event loop.
+
+        The queue and stop event are created anew so the log can be started
+        again on another loop (e.g. a second application lifespan); records
+        still queued are carried over.
+        """
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=self.max_queue)
+        while not self._queue.empty():
+            queue.put_nowait(self._queue.get_nowait())
+        self._queue = queue
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write what is still queued."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        while not self._queue.empty():
+            await self._flush(self._drain([]))
+
+    async def _run(self):
+        """Flush loop: wait for a record, collect a batch and write it."""
+        while not self._stopping.is_set():
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                continue
+            # Let more records accumulate so each write covers a bigger batch
+            await asyncio.sleep(min(self.flush_interval_s, 0.05))
+            await self._flush(self._drain([first]))
+
+    def _drain(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(self._write, batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.write_errors += 1
+            self.logger.error(f"Failed to write {len(batch)} capture records: {str(e)}")
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """Append a batch to the active file, rotating it when full (worker thread)."""
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            size = f.tell()
+        if size >= self.max_file_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Move the active file aside under a timestamped name, gzipping it if enabled."""
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        rotated = os.path.join(self.directory, f"{self._basename}-{stamp}-{self.rotations:04d}.jsonl")
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self.rotations += 1
+
+    def files(self) -> List[str]:
+        """Capture files in chronological order."""
+        return capture_files(self.directory, self._basename)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and recorded/dropped/written counters."""
+        return {
+            "queued": self._queue.qsize(),
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "written": self.written,
+            "write_errors": self.write_errors,
+            "rotations": self.rotations,
+            "files": len(self.files()),
+        }
+
+
+def capture_files(directory: str, basename: str = "requests") -> List[str]:
+    """Capture files of a directory: rotated ones (oldest first), then the active one."""
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    rotated = sorted(
+        name for name in names
+        if name.startswith(f"{basename}-") and name.endswith((".jsonl", ".jsonl.gz"))
+    )
+    active = [f"{basename}.jsonl"] if f"{basename}.jsonl" in names else []
+    return [os.path.join(directory, name) for name in rotated + active]
+
+
+def read_capture(paths: List[str]):
+    """Yield the records of capture files (plain or gzipped) in order."""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
@@ -0,0 +1,212 @@
+# app/services/catalog_registry.py
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+import logging
+import os
+import re
+import threading
+import time
+import numpy as np
+from app.services.vector_store import VectorStoreService
+
+_CATALOG_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class CatalogNotFound(ValueError):
+    """Raised when a catalog id has no index on disk."""
+
+
+class _CatalogStats:
+    """Load/evict counters and recent retrieval latencies of one catalog."""
+
+    def __init__(self):
+        self.loads = 0
+        self.evictions = 0
+        self.last_load_ms: Optional[float] = None
+        self.requests = 0
+        self.latencies_ms: deque = deque(maxlen=512)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = None
+        if self.latencies_ms:
+            values = np.asarray(self.latencies_ms)
+            latency = {
+                "mean": round(float(values.mean()), 3),
+                "p50": round(float(np.percentile(values, 50)), 3),
+                "p95": round(float(np.percentile(values, 95)), 3),
+            }
+        return {
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "last_load_ms": self.last_load_ms,
+            "requests": self.requests,
+            "latency_ms": latency,
+        }
+
+
+class CatalogRegistry:
+    """Lazily loads one vector store per catalog under a memory budget.
+
+    Catalog indexes live in ``<catalogs_dir>/<catalog_id>/vector_store.index``
+    and are loaded on first use. Concurrent first requests for the same
+    catalog wait on a per-catalog lock so the index is loaded only once.
+    When the estimated size of the loaded catalogs exceeds the budget, the
+    least recently used ones are evicted. The default catalog is pinned.
+    """
+
+    def __init__(
+        self,
+        default_store: VectorStoreService,
+        store_factory: Callable[[str], VectorStoreService],
+        catalogs_dir: str,
+        memory_budget_bytes: int,
+        default_catalog: str = "default"
+    ):
+        """Initialize the registry.
+
+        Args:
+            default_store: Vector store served for the default catalog (never evicted)
+            store_factory: Builds an unloaded VectorStoreService for an index path
+            catalogs_dir: Folder containing one sub-folder per catalog
+            memory_budget_bytes: Budget for the catalogs loaded on demand
+            default_catalog: Id of the default catalog
+        """
+        self.default_store = default_store
+        self.store_factory = store_factory
+        self.catalogs_dir = catalogs_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self.default_catalog = default_catalog
+        self.logger = logging.getLogger(__name__)
+        self._stores: "OrderedDict[str, VectorStoreService]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._mapped_sizes: Dict[str, int] = {}
+        self._stats: Dict[str, _CatalogStats] = {default_catalog: _CatalogStats()}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def index_path(self, catalog_id: str) -> str:
+        """Return the on-disk index path of a catalog."""
+        return os.path.join(self.catalogs_dir, catalog_id, "vector_store.index")
+
+    def get(self, catalog_id: Optional[str] = None) -> VectorStoreService:
+        """Return the vector store of a catalog, loading it if needed.
+
+        Raises:
+            CatalogNotFound: If the id is invalid or the catalog has no index
+        """
+        if catalog_id is None or catalog_id == self.default_catalog:
+            return self.default_store
+        if not _CATALOG_ID.match(catalog_id):
+            raise CatalogNotFound(f"Invalid catalog id '{catalog_id}'")
+        with self._lock:
+            store = self._touch(catalog_id)
+            if store is not None:
+                return store
+        # Checked before creating a load lock so unknown ids leave nothing behind
+        if not os.path.exists(self.index_path(catalog_id)):
+            raise CatalogNotFound(f"Catalog '{catalog_id}' not found")
+        with self._lock:
+            load_lock = self._load_locks.setdefault(catalog_id, threading.Lock())
+
+        # Single-flight: concurrent first requests wait for the one load
+        try:
+            with load_lock:
+                with self._lock:
+                    store = self._touch(catalog_id)
+                    if store is not None:
+                        return store
+                store, size, load_ms = self._load(catalog_id)
+                with self._lock:
+                    self._stores[catalog_id] = store
+                    self._sizes[catalog_id] = size
+                    self._mapped_sizes[catalog_id] = store.mapped_bytes()
+                    stats = self._stats.setdefault(catalog_id, _CatalogStats())
+                    stats.loads += 1
+                    stats.last_load_ms = round(load_ms, 3)
+                    self._evict_over_budget(keep=catalog_id)
+        finally:
+            # Waiters already hold the lock object; later requests find the store loaded
+            with self._lock:
+                if self._load_locks.get(catalog_id) is load_lock:
+                    del self._load_locks[catalog_id]
+        self.logger.info(f"Loaded catalog '{catalog_id}' ({size / 2**20:.1f} MiB) in {load_ms:.0f}ms")
+        return store
+
+    def _touch(self, catalog_id: str) -> Optional[VectorStoreService]:
+        """Return a loaded store and mark it as recently used (lock held)."""
+        store = self._stores.get(catalog_id)
+        if store is not None:
+            self._stores.move_to_end(catalog_id)
+        return store
+
+    def _load(self, catalog_id: str):
+        """Load a catalog index from disk."""
+        path = self.index_path(catalog_id)
+        if not os.path.exists(path):
+            raise CatalogNotFound(f"Catalog '{catalog_id}' not found")
+        start = time.perf_counter()
+        store = self.store_factory(path)
+        store.load_index()
+        if not any(store.shards):
+            raise CatalogNotFound(f"Catalog '{catalog_id}' has no index")
+        return store, store.estimated_bytes(), (time.perf_counter() - start) * 1000
+
+    def _evict_over_budget(self, keep: str):
+        """Evict least recently used catalogs until the budget is met (lock held)."""
+        while self.used_bytes() > self.memory_budget_bytes:
+            victim = next((cid for cid in self._stores if cid != keep), None)
+            if victim is None:
+                break
+            self._evict(victim)
+
+    def evict(self, catalog_id: str) -> bool:
+        """Unload a catalog. Returns False if it was not loaded."""
+        with self._lock:
+            return self._evict(catalog_id)
+
+    def _evict(self, catalog_id: str) -> bool:
+        """Unload a catalog (lock held)."""
+        store = self._stores.pop(catalog_id, None)
+        if store is None:
+            return False
+        self._sizes.pop(catalog_id, None)
+        self._mapped_sizes.pop(catalog_id, None)
+        # Not closed: in-flight searches may still hold the store; GC reclaims it
+        self._stats[catalog_id].evictions += 1
+        self.logger.info(f"Evicted catalog '{catalog_id}'")
+        return True
+
+    def used_bytes(self) -> int:
+        """Estimated resident memory held by catalogs loaded on demand."""
+        return sum(self._sizes.values())
+
+    def mapped_bytes(self) -> int:
+        """Vector bytes of loaded catalogs served from memory-mapped files."""
+        return sum(self._mapped_sizes.values())
+
+    def record_latency(self, catalog_id: Optional[str], latency_ms: float):
+        """Record the retrieval latency of a request against a catalog."""
+        with self._lock:
+            stats = self._stats.setdefault(catalog_id or self.default_catalog, _CatalogStats())
+            stats.requests += 1
+            stats.latencies_ms.append(latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return budget usage plus per-catalog load/evict counts and latency."""
+        with self._lock:
+            return {
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "memory_used_bytes": self.used_bytes(),
+                "mapped_bytes": self.mapped_bytes(),
+                "loads": sum(s.loads for s in self._stats.values()),
+                "evictions": sum(s.evictions for s in self._stats.values()),
+                "catalogs": {
+                    catalog_id: {
+                        "loaded": catalog_id == self.default_catalog or catalog_id in self._stores,
+                        "estimated_bytes": self._sizes.get(catalog_id),
+                        "mapped_bytes": self._mapped_sizes.get(catalog_id),
+                        **stats.to_dict(),
+                    }
+                    for catalog_id, stats in self._stats.items()
+                },
+            }
@@ -0,0 +1,132 @@
+# app/services/dedup.py
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import logging
+import re
+import time
+import zlib
+import numpy as np
+from langchain.docstore.document import Document
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class NearDuplicateDetector:
+    """MinHash/LSH near-duplicate detection over document chunks.
+
+    Each chunk is reduced to a MinHash signature of its word shingles.
+    Signatures are split into LSH bands; chunks sharing a band bucket become
+    candidates, and candidates whose estimated Jaccard similarity reaches the
+    threshold are clustered together. Each cluster is collapsed into a single
+    record that keeps the names of all its sources.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """Initialize the detector.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity to merge two chunks
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Number of words per shingle
+            seed: Seed of the hash permutations
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = self._choose_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        # 32-bit coefficients keep a * hash + b below 2**64 for 32-bit hashes
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _choose_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+        """Pick the (bands, rows) split whose LSH threshold (1/b)^(1/r) is the
+        closest one at or below the target, favouring recall; candidates are
+        verified against the signature afterwards."""
+        splits = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+        below = [split for split in splits if (1 / split[0]) ** (1 / split[1]) <= threshold]
+        return max(below or splits[-1:], key=lambda split: (1 / split[0]) ** (1 / split[1]))
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """Hash the word shingles of a normalized text."""
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            grams = [" ".join(words)]
+        else:
+            grams = {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        hashes = self._shingles(text)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def find_clusters(self, texts: List[str]) -> List[int]:
+        """Assign every text to a near-duplicate cluster.
+
+        Returns:
+            Cluster id per text; the id is the index of the cluster's first text
+        """
+        signatures = np.vstack([self.signature(text) for text in texts]) if texts else np.empty((0, self.num_perm))
+        parent = list(range(len(texts)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = defaultdict(list)
+            band_rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for i, row in enumerate(band_rows):
+                buckets[row.tobytes()].append(i)
+            for members in buckets.values():
+                first = members[0]
+                for other in members[1:]:
+                    root_first, root_other = find(first), find(other)
+                    if root_first == root_other:
+                        continue
+                    if np.mean(signatures[first] == signatures[other]) >= self.threshold:
+                        parent[max(root_first, root_other)] = min(root_first, root_other)
+
+        return [find(i) for i in range(len(texts))]
+
+    def collapse(self, documents: List[Document]) -> Tuple[List[Document], Dict[str, float]]:
+        """Collapse near-duplicate documents into one record per cluster.
+
+        The longest chunk of each cluster is kept; its metadata gains
+        ``sources`` (all source names in the cluster) and ``duplicates``.
+
+        Returns:
+            Tuple of (collapsed documents, stats)
+        """
+        start = time.perf_counter()
+        clusters: Dict[int, List[Document]] = defaultdict(list)
+        for doc, cluster_id in zip(documents, self.find_clusters([d.page_content for d in documents])):
+            clusters[cluster_id].append(doc)
+
+        collapsed = []
+        for members in clusters.values():
+            if len(members) == 1:
+                collapsed.append(members[0])
+                continue
+            keeper = max(members, key=lambda d: len(d.page_content))
+            sources = sorted({d.metadata.get("source", "unknown") for d in members})
+            collapsed.append(Document(
+                page_content=keeper.page_content,
+                metadata={**keeper.metadata, "sources": sources, "duplicates": len(members) - 1}
+            ))
+
+        stats = {
+            "input": len(documents),
+            "output": len(collapsed),
+            "reduction_ratio": round(1 - len(collapsed) / len(documents), 4) if documents else 0.0,
+            "elapsed_s": round(time.perf_counter() - start, 4),
+        }
+        self.logger.info(f"Near-duplicate collapse: {stats}")
+        return collapsed, stats
@@ -0,0 +1,375 @@
+# app/services/ingestion.py
+from typing import Any, Dict, List, Optional, Set
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from langchain.docstore.document import Document
+from app.services.vector_store import VectorStoreService
+
+
+class WriteAheadLog:
+    """Durable, append-only log of document changes.
+
+    Each change is one JSON line with a monotonically increasing sequence
+    number, fsync'ed before the API acknowledges it. Changes already covered
+    by a persisted index snapshot are dropped by ``truncate_through``. A line
+    torn by a crash mid-write is cut off when the log is opened, so new
+    changes never get appended to it.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the log, recovering the last sequence number from disk.
+
+        Args:
+            path: File the changes are appended to
+        """
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._repair_tail()
+        entries = self.read_all()
+        self.last_seq = entries[-1]["seq"] if entries else 0
+
+    def _repair_tail(self):
+        """Truncate a partial last line back to the last complete newline."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Walk back in blocks to the last newline
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+        self.logger.warning(f"Truncated a torn write-ahead log line ({size - end} bytes) in {self.path}")
+
+    def append(self, op: Dict[str, Any]) -> int:
+        """Durably append a change and return its sequence number."""
+        with self._lock:
+            self.last_seq += 1
+            entry = {"seq": self.last_seq, **op}
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            return entry["seq"]
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return every logged change in order, skipping malformed lines."""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def truncate_through(self, seq: int):
+        """Drop the changes with a sequence number up to ``seq``."""
+        with self._lock:
+            remaining = [entry for entry in self.read_all() if entry["seq"] > seq]
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in remaining:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class IngestionService:
+    """Applies document uploads and deletions to the live index.
+
+    Requests are appended to the write-ahead log and return immediately. A
+    background worker drains them in batches, embeds the new documents in a
+    single call and applies the batch with a copy-on-write shard swap, so
+    queries keep running against the previous snapshot meanwhile. Every
+    ``compaction_interval_s`` the index is saved and the applied part of the
+    log is truncated. On start, logged changes not yet in the snapshot are
+    replayed; upserts replace by source, so replays are idempotent.
+
+    Changes are queued in log order, and for each source only the change with
+    the highest sequence number is applied, so the live index always matches
+    what a replay of the log would build. ``applied_seq`` is a watermark:
+    every change up to it has been applied, so compaction never truncates a
+    change that is still queued.
+
+    A batch that fails is retried with exponential backoff. If it still
+    fails, its changes are applied one by one and those that keep failing
+    are moved to a dead-letter file, so the log can be compacted again.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreService,
+        wal: WriteAheadLog,
+        batch_size: int = 64,
+        batch_wait_s: float = 0.2,
+        compaction_interval_s: float = 300,
+        max_retries: int = 3,
+        retry_backoff_s: float = 0.5,
+        dead_letter_path: Optional[str] = None
+    ):
+        """Initialize the service.
+
+        Args:
+            vector_store: Live vector store receiving the changes
+            wal: Write-ahead log of pending changes
+            batch_size: Maximum number of changes applied together
+            batch_wait_s: How long to wait for a batch to fill up
+            compaction_interval_s: Seconds between index snapshots
+            max_retries: Retries of a failed batch before isolating its changes
+            retry_backoff_s: Delay before the first retry, doubled on each attempt
+            dead_letter_path: JSONL file receiving changes that cannot be applied
+                (defaults to the log path with a ``.dead`` suffix)
+        """
+        self.vector_store = vector_store
+        self.wal = wal
+        self.batch_size = batch_size
+        self.batch_wait_s = batch_wait_s
+        self.compaction_interval_s = compaction_interval_s
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.dead_letter_path = dead_letter_path or f"{wal.path}.dead"
+        self.logger = logging.getLogger(__name__)
+        self.applied_seq = 0
+        self.snapshot_seq = 0
+        self.batches = 0
+        self.compactions = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.last_batch_ms: Optional[float] = None
+        self.failed_seq: Optional[int] = None
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        # Held across the log append and the enqueue so the queue follows log order
+        self._submit_lock = threading.Lock()
+        # Sequence numbers queued but not yet applied or dead-lettered
+        self._in_flight: Set[int] = set()
+        self._highest_seq = 0
+        # Highest sequence number applied per source, so older changes never win
+        self._source_seq: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_compaction = time.monotonic()
+        # Dead letters whose write failed, kept until it succeeds
+        self._undelivered: List[Dict[str, Any]] = []
+
+    def start(self):
+        """Replay unsnapshotted changes and start the background worker."""
+        pending = self.wal.read_all()
+        with self._submit_lock:
+            for entry in pending:
+                self._enqueue(entry)
+        if pending:
+            self.logger.info(f"Replaying {len(pending)} logged document changes")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Drain pending changes, snapshot the index and stop the worker.
+
+        If the worker is still applying a batch after ``timeout``, the final
+        snapshot is skipped; the log keeps the changes for the next start.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Snapshotting now could race the batch the worker is applying;
+                # the unsnapshotted changes stay in the log and are replayed
+                self.logger.warning(f"Ingestion worker still busy after {timeout}s, skipping final snapshot")
+                return
+        self.compact()
+
+    def submit_upsert(self, source: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Log an upload (replacing any document with the same source)."""
+        return self._submit({
+            "op": "upsert",
+            "source": source,
+            "content": content,
+            "metadata": metadata or {},
+        })
+
+    def submit_delete(self, source: str) -> int:
+        """Log the deletion of every chunk of a source."""
+        return self._submit({"op": "delete", "source": source})
+
+    def _submit(self, op: Dict[str, Any]) -> int:
+        with self._submit_lock:
+            seq = self.wal.append(op)
+            self._enqueue({"seq": seq, **op})
+        return seq
+
+    def _enqueue(self, entry: Dict[str, Any]):
+        """Queue a logged change (submit lock held)."""
+        self._in_flight.add(entry["seq"])
+        self._highest_seq = max(self._highest_seq, entry["seq"])
+        self._queue.put(entry)
+
+    def _mark_done(self, batch: List[Dict[str, Any]]):
+        """Retire applied or dead-lettered changes and advance the watermark."""
+        with self._submit_lock:
+            self._in_flight.difference_update(entry["seq"] for entry in batch)
+            self.applied_seq = min(self._in_flight) - 1 if self._in_flight else self._highest_seq
+
+    def _run(self):
+        """Worker loop: batch, apply and periodically compact."""
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._process(batch)
+            if self._undelivered:
+                self._dead_letter([])
+            if time.monotonic() - self._last_compaction >= self.compaction_interval_s:
+                self.compact()
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Collect up to batch_size changes, waiting at most batch_wait_s after the first."""
+        try:
+            batch = [self._queue.get(timeout=self.batch_wait_s)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _process(self, batch: List[Dict[str, Any]]):
+        """Apply a batch, retrying with backoff and dead-lettering what keeps failing."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._apply(batch)
+                self._mark_done(batch)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.logger.error(f"Failed to apply ingestion batch: {str(e)}", exc_info=True)
+                    break
+                delay = self.retry_backoff_s * 2 ** attempt
+                self.retries += 1
+                self.logger.warning(f"Failed to apply ingestion batch, retrying in {delay}s: {str(e)}")
+                time.sleep(delay)
+
+        # Apply the changes one by one (in log order) so a single bad change
+        # does not hold back the rest of the batch
+        failed = []
+        for entry in sorted(batch, key=lambda entry: entry["seq"]):
+            try:
+                self._apply([entry])
+            except Exception as e:
+                failed.append({**entry, "error": str(e)})
+        if failed:
+            self._dead_letter(failed)
+        self._mark_done(batch)
+
+    def _dead_letter(self, entries: List[Dict[str, Any]]):
+        """Durably record changes that could not be applied.
+
+        While the write fails, ``failed_seq`` keeps compaction from dropping
+        these changes from the log; it is cleared once they are written.
+        """
+        self._undelivered.extend(entries)
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for entry in self._undelivered:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            self.failed_seq = min(entry["seq"] for entry in self._undelivered)
+            self.logger.error(f"Failed to write {len(self._undelivered)} dead-lettered changes: {str(e)}")
+            return
+        self.logger.error(
+            f"Moved {len(self._undelivered)} unappliable document changes to {self.dead_letter_path}"
+        )
+        self.dead_lettered += len(self._undelivered)
+        self._undelivered = []
+        self.failed_seq = None
+
+    def _apply(self, batch: List[Dict[str, Any]]):
+        """Embed and apply a batch of changes; the latest change per source wins.
+
+        "Latest" is by sequence number, including changes applied by earlier
+        batches, so a replayed or late duplicate never overrides a newer one.
+        """
+        start = time.perf_counter()
+        latest: Dict[str, Dict[str, Any]] = {}
+        for entry in batch:
+            source = entry["source"]
+            if entry["seq"] <= self._source_seq.get(source, 0):
+                continue
+            if source not in latest or entry["seq"] > latest[source]["seq"]:
+                latest[source] = entry
+
+        deletes = [source for source, entry in latest.items() if entry["op"] == "delete"]
+        documents = [
+            Document(page_content=entry["content"], metadata={**entry["metadata"], "source": source})
+            for source, entry in latest.items() if entry["op"] == "upsert"
+        ]
+        # Embedding happens outside the store's write lock
+        embeddings = self.vector_store.embeddings.embed_documents(
+            [doc.page_content for doc in documents]
+        ) if documents else []
+        self.vector_store.apply_changes(upserts=zip(documents, embeddings), deletes=deletes)
+
+        for source, entry in latest.items():
+            self._source_seq[source] = entry["seq"]
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.logger.debug(f"Applied {len(batch)} document changes in {self.last_batch_ms}ms")
+
+    def compact(self):
+        """Persist a fresh index snapshot and truncate the applied log entries."""
+        self._last_compaction = time.monotonic()
+        applied_seq = self.applied_seq
+        if self.failed_seq is not None:
+            applied_seq = min(applied_seq, self.failed_seq - 1)
+        if applied_seq <= self.snapshot_seq:
+            return
+        self.vector_store.save_snapshot()
+        self.wal.truncate_through(applied_seq)
+        self.snapshot_seq = applied_seq
+        self.compactions += 1
+        self.logger.info(f"Index snapshot saved through change #{applied_seq}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, sequence numbers and batch counters."""
+        return {
+            "pending": self._queue.qsize(),
+            "last_seq": self.wal.last_seq,
+            "applied_seq": self.applied_seq,
+            "snapshot_seq": self.snapshot_seq,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "compactions": self.compactions,
+            "retries": self.retries,
+            "dead_lettered": self.dead_lettered,
+            "failed_seq": self.failed_seq,
+        }
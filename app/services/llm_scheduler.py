@@ -0,0 +1,172 @@
+# app/services/llm_scheduler.py
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import numpy as np
+
+PRIORITIES = ("interactive", "batch")
+
+
+class _ClassQueue:
+    """Waiters and wait-time statistics of one priority class."""
+
+    def __init__(self):
+        self.heap: List[tuple] = []
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        self.active = 0
+        self.granted = 0
+        self.cancelled = 0
+        self.waits_ms: Deque[float] = deque(maxlen=1024)
+
+    def to_dict(self) -> Dict[str, Any]:
+        wait = None
+        if self.waits_ms:
+            values = np.asarray(self.waits_ms)
+            wait = {
+                "mean": round(float(values.mean()), 3),
+                "p50": round(float(np.percentile(values, 50)), 3),
+                "p95": round(float(np.percentile(values, 95)), 3),
+                "max": round(float(values.max()), 3),
+            }
+        return {
+            "waiting": sum(1 for *_, future in self.heap if not future.done()),
+            "active": self.active,
+            "granted": self.granted,
+            "cancelled": self.cancelled,
+            "queue_wait_ms": wait,
+        }
+
+
+class LLMScheduler:
+    """Caps concurrent LLM calls and decides who goes next.
+
+    At most ``max_concurrency`` calls are in flight. Free slots go to the
+    interactive class first; batch calls only get a slot while fewer than
+    ``batch_max_concurrency`` batch calls are running, so a batch flood always
+    leaves headroom for interactive traffic. Within a class, waiters are
+    served by weighted fair queueing on ``user_id``: each request gets a
+    virtual finish time of ``max(class virtual time, user's last finish) +
+    1 / weight``, so a user with a thousand queued requests cannot starve a
+    user with one.
+
+    The scheduler lives on one event loop and needs no locking.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        batch_max_concurrency: Optional[int] = None,
+        user_weights: Optional[Dict[str, float]] = None
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of concurrent upstream calls
+            batch_max_concurrency: Maximum concurrent batch calls
+                (defaults to max_concurrency - 1, at least 1)
+            user_weights: Relative share per user_id (default 1.0)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.batch_max_concurrency = min(
+            batch_max_concurrency or max(max_concurrency - 1, 1), max_concurrency
+        )
+        self.user_weights = user_weights or {}
+        self.logger = logging.getLogger(__name__)
+        self._classes = {priority: _ClassQueue() for priority in PRIORITIES}
+        self._active = 0
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str] = None, priority: str = "interactive"):
+        """Hold one upstream call slot for the duration of the block.
+
+        Args:
+            user_id: Caller used for fair queueing (anonymous callers share one queue)
+            priority: "interactive" or "batch"
+
+        Raises:
+            ValueError: If the priority class is unknown
+        """
+        await self.acquire(user_id, priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def acquire(self, user_id: Optional[str] = None, priority: str = "interactive"):
+        """Wait for a slot; cancelling the caller removes it from the queue."""
+        if priority not in self._classes:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {PRIORITIES}")
+        queue = self._classes[priority]
+        user = user_id or ""
+        start = max(queue.virtual_time, queue.last_finish.get(user, 0.0))
+        finish = start + 1.0 / self.user_weights.get(user, 1.0)
+        queue.last_finish[user] = finish
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(queue.heap, (finish, next(self._seq), start, future))
+        enqueued = time.perf_counter()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted in the same tick the caller was cancelled
+                self.release(priority)
+            else:
+                future.cancel()
+                queue.cancelled += 1
+            raise
+        queue.waits_ms.append((time.perf_counter() - enqueued) * 1000)
+
+    def release(self, priority: str):
+        """Return a slot and hand it to the next waiter."""
+        self._active -= 1
+        self._classes[priority].active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots: interactive first, then batch up to its cap."""
+        while self._active < self.max_concurrency:
+            for priority in PRIORITIES:
+                queue = self._classes[priority]
+                if priority == "batch" and queue.active >= self.batch_max_concurrency:
+                    continue
+                if self._grant(queue):
+                    break
+            else:
+                return
+
+    def _grant(self, queue: _ClassQueue) -> bool:
+        """Wake the waiter with the smallest virtual finish time, if any."""
+        while queue.heap:
+            _, _, start, future = heapq.heappop(queue.heap)
+            if future.done():  # cancelled while queued
+                continue
+            queue.virtual_time = max(queue.virtual_time, start)
+            queue.active += 1
+            queue.granted += 1
+            self._active += 1
+            future.set_result(None)
+            if not queue.heap:
+                # Idle class: finish times of past requests no longer matter
+                queue.last_finish.clear()
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the concurrency limits plus per-class queue and wait stats."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "batch_max_concurrency": self.batch_max_concurrency,
+            "active": self._active,
+            "classes": {priority: queue.to_dict() for priority, queue in self._classes.items()},
+        }
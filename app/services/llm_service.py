@@ -3,10 +3,35 @@ from langchain_openai import ChatOpenAI
 from langchain_community.cache import InMemoryCache
 from langchain.globals import set_llm_cache
 from app.config import settings
+from app.services.cache import LRUCache
+from app.services.llm_scheduler import LLMScheduler
 from langchain.schema import HumanMessage, SystemMessage
 import logging
 import os 
 
+# Recompute cost assumed for a cached completion (a typical LLM round trip)
+_LLM_ENTRY_COST_MS = 1000.0
+
+class LLMResponseCache(InMemoryCache):
+    """LangChain LLM cache stored in an LRUCache.
+
+    Bounded by entry count and, once attached to the memory manager, by the
+    shared cache byte budget, unlike the unbounded InMemoryCache it replaces.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.entries = LRUCache(maxsize, name="llm", default_cost_ms=_LLM_ENTRY_COST_MS)
+
+    def lookup(self, prompt: str, llm_string: str):
+        return self.entries.get((prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        self.entries.put((prompt, llm_string), return_val)
+
+    def clear(self, **kwargs):
+        self.entries.clear()
+
 class LLMService:
     """Service wrapper for LLM operations with caching and configuration."""
     
@@ -15,6 +40,10 @@ class LLMService:
         self._validate_api_key()
         self._configure_cache()
         self.llm = self._initialize_llm()
+        self.scheduler = LLMScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            batch_max_concurrency=settings.LLM_BATCH_MAX_CONCURRENCY
+        )
         
         
     def _validate_api_key(self):
@@ -27,7 +56,8 @@ class LLMService:
             
     def _configure_cache(self):
         """Setup caching to reduce duplicate LLM calls."""
-        set_llm_cache(InMemoryCache())
+        self.cache = LLMResponseCache(settings.LLM_CACHE_SIZE)
+        set_llm_cache(self.cache)
         self.logger.info("LLM response caching enabled")
 
     def _initialize_llm(self):
@@ -39,6 +69,7 @@ class LLMService:
             top_p=0.9,
             frequency_penalty=0.1,
             presence_penalty=0.1,
+            timeout=settings.LLM_TIMEOUT_S,  # Upper bound for calls made without a request deadline
             api_key=settings.OPENAI_API_KEY
         )
 
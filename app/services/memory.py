@@ -0,0 +1,152 @@
+# app/services/memory.py
+from typing import Any, Callable, Dict, Optional
+import logging
+import os
+import sys
+import threading
+import weakref
+import numpy as np
+
+# Per-object overhead assumed for objects whose contents are not walked
+_OBJECT_OVERHEAD = 64
+
+
+def estimate_size(obj: Any, depth: int = 4) -> int:
+    """Approximate the memory held by an object and what it references.
+
+    Walks containers and object attributes up to ``depth`` levels; shared
+    objects are counted every time they are referenced. Good enough to rank
+    cache entries and to budget, not an exact measurement.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + _OBJECT_OVERHEAD
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if depth <= 0:
+        return _OBJECT_OVERHEAD
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        if obj and all(type(item) is float for item in obj):
+            # Embedding vectors: skip the per-item walk
+            return sys.getsizeof(obj) + len(obj) * sys.getsizeof(0.0)
+        return sys.getsizeof(obj) + sum(estimate_size(item, depth - 1) for item in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(key, depth - 1) + estimate_size(value, depth - 1) for key, value in obj.items()
+        )
+    attributes = getattr(obj, "__dict__", None)
+    if attributes is not None:
+        return sys.getsizeof(obj) + estimate_size(attributes, depth - 1)
+    return sys.getsizeof(obj)
+
+
+def model_bytes(embeddings: Any) -> int:
+    """Parameter and buffer bytes of a sentence-transformers embedding model (0 if unknown)."""
+    client = getattr(embeddings, "_client", None)
+    if client is None or not hasattr(client, "parameters"):
+        return 0
+    tensors = list(client.parameters()) + list(client.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux), or None when unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class MemoryManager:
+    """Central memory accounting with one byte budget shared by all caches.
+
+    Components such as the FAISS index or the embedding model only report
+    their size; memory-mapped components are reported apart, as the page
+    cache holding them is not part of the accounted total. Attached caches additionally share ``cache_budget_bytes``:
+    when their total exceeds it, entries are evicted across all caches by
+    GreedyDual-Size. Each entry has a priority ``clock + cost / size``, where
+    cost is the time it took to compute; the entry with the lowest priority
+    goes first and the clock advances to its priority, so entries that are
+    cheap to recompute per byte and not recently used are evicted first.
+    """
+
+    def __init__(self, cache_budget_bytes: int):
+        """Initialize the manager.
+
+        Args:
+            cache_budget_bytes: Byte budget shared by every attached cache
+        """
+        self.cache_budget_bytes = cache_budget_bytes
+        self.clock = 0.0
+        self.evictions = 0
+        self.logger = logging.getLogger(__name__)
+        self._components: Dict[str, Callable[[], int]] = {}
+        self._mapped: Dict[str, Callable[[], int]] = {}
+        # Weak references: caches of unloaded stores should not be kept alive
+        self._caches: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, size_fn: Callable[[], int], mapped: bool = False):
+        """Register a component that reports its size in bytes.
+
+        Args:
+            name: Component name in the report
+            size_fn: Returns the current size in bytes
+            mapped: The bytes are memory-mapped files (reported, not accounted)
+        """
+        (self._mapped if mapped else self._components)[name] = size_fn
+
+    def attach(self, cache, name: Optional[str] = None):
+        """Put a cache (an LRUCache) under the shared budget."""
+        cache.memory = self
+        self._caches[name or cache.name] = cache
+        self.enforce()
+
+    def cache_bytes(self) -> int:
+        """Estimated bytes held by all attached caches."""
+        return sum(cache.bytes for cache in list(self._caches.values()))
+
+    def enforce(self):
+        """Evict the lowest-priority cache entries until the budget is met."""
+        with self._lock:
+            while self.cache_bytes() > self.cache_budget_bytes:
+                candidates = [
+                    (priority, cache) for cache in list(self._caches.values())
+                    if (priority := cache.min_priority()) is not None
+                ]
+                if not candidates:
+                    break
+                priority, cache = min(candidates, key=lambda candidate: candidate[0])
+                if cache.evict_cheapest() is not None:
+                    self.clock = max(self.clock, priority)
+                    self.evictions += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Return the per-component memory breakdown."""
+        components = self._sizes(self._components)
+        caches = {
+            name: {"bytes": cache.bytes, "entries": len(cache), "evictions": cache.evictions}
+            for name, cache in list(self._caches.items())
+        }
+        cache_bytes = sum(cache["bytes"] for cache in caches.values())
+        return {
+            "cache_budget_bytes": self.cache_budget_bytes,
+            "cache_bytes": cache_bytes,
+            "budget_evictions": self.evictions,
+            "components": components,
+            "mapped": self._sizes(self._mapped),
+            "caches": caches,
+            "accounted_bytes": cache_bytes + sum(size or 0 for size in components.values()),
+            "rss_bytes": process_rss_bytes(),
+        }
+
+    def _sizes(self, size_fns: Dict[str, Callable[[], int]]) -> Dict[str, Optional[int]]:
+        """Call every size function; a failing one is reported as None."""
+        sizes = {}
+        for name, size_fn in size_fns.items():
+            try:
+                sizes[name] = int(size_fn())
+            except Exception as e:
+                self.logger.warning(f"Could not size component '{name}': {str(e)}")
+                sizes[name] = None
+        return sizes
@@ -0,0 +1,49 @@
+# app/services/mmr.py
+from typing import List
+import numpy as np
+
+
+def mmr_select(
+    query_vector: np.ndarray,
+    candidate_vectors: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """Pick ``k`` candidates by maximal marginal relevance.
+
+    Each step selects the candidate maximizing
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max(sim(c, selected))``
+    with cosine similarity. The query and pairwise similarities are computed
+    once as matrix products; the greedy loop then only updates a running
+    maximum per candidate, so the cost is one (n x n) product plus O(k * n).
+
+    Args:
+        query_vector: Query embedding, shape (d,)
+        candidate_vectors: Candidate embeddings ordered by relevance, shape (n, d)
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    count = min(k, len(candidate_vectors))
+    if count <= 0:
+        return []
+    vectors = np.asarray(candidate_vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = vectors @ query
+    similarity = vectors @ vectors.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    relevance_term = lambda_mult * relevance
+    for _ in range(count - 1):
+        scores = relevance_term - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
@@ -0,0 +1,116 @@
+# app/services/query_log.py
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+
+class QueryLog:
+    """Append-only log of served queries with in-memory frequency stats.
+
+    Each served query is appended as one JSON line, together with the catalog
+    it was asked against. ``record`` only updates the counters and buffers
+    the line; a background thread appends the buffer to the file, so the
+    request path never waits on disk. On startup the existing log is replayed
+    into a counter so the most popular queries of every catalog can be warmed
+    before traffic arrives.
+    """
+
+    def __init__(self, path: str, flush_interval_s: float = 1.0, max_pending: int = 10000):
+        """Initialize the log.
+
+        Args:
+            path: JSONL file the queries are appended to
+            flush_interval_s: Seconds between background writes
+            max_pending: Lines buffered before new ones are dropped (still counted)
+        """
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.counts: Counter = Counter()
+        self.dropped = 0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # Keeps concurrent flushes (writer thread and stop) in order
+        self._flush_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> int:
+        """Rebuild frequency stats from the log file.
+
+        Returns:
+            Number of records read
+        """
+        if not os.path.exists(self.path):
+            return 0
+        records = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    query = entry["query"]
+                except (ValueError, KeyError):
+                    self.logger.warning("Skipping malformed query log line")
+                    continue
+                self.counts[(query, entry.get("catalog_id"))] += 1
+                records += 1
+        self.logger.info(f"Loaded {records} queries ({len(self.counts)} distinct) from {self.path}")
+        return records
+
+    def start(self):
+        """Start the background writer."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Stop the background writer and write what is still buffered."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_s):
+            self.flush()
+
+    def record(self, query: str, user_id: str = None, catalog_id: Optional[str] = None):
+        """Count a served query and buffer its log line (never touches the disk)."""
+        query = query.strip()
+        line = json.dumps({
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "user_id": user_id,
+            "catalog_id": catalog_id,
+            "query": query,
+        }, ensure_ascii=False)
+        with self._lock:
+            self.counts[(query, catalog_id)] += 1
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(line)
+
+    def flush(self):
+        """Append the buffered lines to the log file."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in pending))
+            except OSError as e:
+                self.logger.error(f"Could not write {len(pending)} query log lines: {str(e)}")
+
+    def top(self, n: int) -> List[Tuple[str, Optional[str], int]]:
+        """Return the n most frequent (query, catalog_id, count) triples."""
+        with self._lock:
+            return [(query, catalog_id, count) for (query, catalog_id), count in self.counts.most_common(n)]
@@ -0,0 +1,170 @@
+# app/services/tracing.py
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import logging
+import random
+import threading
+import time
+import uuid
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+
+class Span:
+    """A timed section of a request (pipeline node, FAISS call, LLM call...)."""
+
+    __slots__ = ("name", "start", "end", "thread_id", "attributes")
+
+    def __init__(self, name: str, start: float, end: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+
+class Trace:
+    """Spans recorded for a single request."""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def summary(self) -> Dict[str, Any]:
+        """Short description used when listing traces."""
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "spans": len(self.spans),
+            "attributes": self.attributes,
+        }
+
+    def stage_ms(self) -> Dict[str, float]:
+        """Total time per span name (e.g. all shard searches summed)."""
+        stages: Dict[str, float] = {}
+        for span in self.spans:
+            stages[span.name] = stages.get(span.name, 0.0) + span.duration_ms
+        return {name: round(ms, 3) for name, ms in stages.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full trace with span offsets relative to the request start."""
+        return {
+            **self.summary(),
+            "spans": [
+                {
+                    "name": span.name,
+                    "offset_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": round(span.duration_ms, 3),
+                    "thread_id": span.thread_id,
+                    "attributes": span.attributes,
+                }
+                for span in sorted(self.spans, key=lambda s: s.start)
+            ],
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Export in the Chrome Trace Event format (chrome://tracing, Perfetto)."""
+        def event(name, start, end, tid, args):
+            return {
+                "name": name, "ph": "X", "pid": 1, "tid": tid,
+                "ts": round((start - self.start) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "args": args,
+            }
+        events = [event(self.name, self.start, self.end or time.perf_counter(), 0, self.attributes)]
+        events.extend(
+            event(span.name, span.start, span.end, span.thread_id, span.attributes)
+            for span in self.spans
+        )
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id, "started_at": self.started_at},
+        }
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a section of the current request, if it is being traced.
+
+    Costs a single context variable lookup when no trace is active.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append(Span(name, start, time.perf_counter(), attributes))
+
+
+class SlowRequestTracer:
+    """Keeps span traces of requests slower than a threshold.
+
+    Sampled requests record lightweight spans; when the request finishes its
+    trace is kept in a bounded ring buffer only if it crossed the threshold,
+    otherwise it is discarded.
+    """
+
+    def __init__(self, threshold_ms: float, buffer_size: int = 100, sample_rate: float = 1.0):
+        """Initialize the tracer.
+
+        Args:
+            threshold_ms: Minimum request latency for a trace to be kept
+            buffer_size: Maximum number of traces kept (oldest are dropped)
+            sample_rate: Fraction of requests that record spans at all
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.traces: deque = deque(maxlen=buffer_size)
+        self.logger = logging.getLogger(__name__)
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """Trace a request; spans opened inside are attached to it."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace(name, attributes)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+            trace.end = time.perf_counter()
+            if trace.duration_ms >= self.threshold_ms:
+                self.traces.append(trace)
+                self.logger.warning(
+                    f"Slow request {trace.name} took {trace.duration_ms:.1f}ms "
+                    f"(trace {trace.trace_id})"
+                )
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the kept traces, newest first."""
+        return [trace.summary() for trace in reversed(self.traces)]
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        """Return a kept trace by id."""
+        for trace in self.traces:
+            if trace.trace_id == trace_id:
+                return trace
+        return None
@@ -1,52 +1,569 @@
 # app/services/vector_store.py
 from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+import contextvars
+import heapq
+import logging
 import os
 import pickle
-from langchain_huggingface import HuggingFaceEmbeddings 
+import shutil
+import threading
+import time
+import weakref
+import zlib
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_huggingface import HuggingFaceEmbeddings
+import faiss
+import numpy as np
 from app.config import settings
+from app.services.cache import LRUCache
+from app.services.mmr import mmr_select
+from app.services.tracing import span
+
+_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+_REDUCTIONS = ("pca", "truncate")
 
 class VectorStoreService:
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
+    """FAISS-backed vector store, optionally partitioned into N shards.
+
+    Documents are routed to a shard by hashing a metadata field (``SHARD_KEY``,
+    e.g. ``source`` or ``category``). Every shard is an independent FAISS index
+    stored in its own folder, so it can be rebuilt without touching the others.
+    Searches fan out to all shards in parallel and the partial results are
+    merged into a global top-k.
+
+    Query embeddings and search results are kept in LRU caches; the result
+    cache is cleared whenever a shard is rebuilt or updated. Every such write
+    bumps a generation counter, and a search only caches its result if the
+    generation did not change while it ran, so a search that started before a
+    swap cannot repopulate the cache with stale documents. Entries record how long
+    they took to compute, which the memory manager uses when evicting.
+
+    Writers never modify a shard that searches may be reading: changes are
+    applied to a copy of the shard, which then replaces the original with a
+    single reference swap (copy-on-write), so ``search`` never waits on a write.
+
+    Indexes can be built with a smaller footprint: vectors reduced by PCA or
+    Matryoshka-style truncation, and/or stored as fp16 or int8 scalar codes.
+    The reduction is a FAISS pre-transform saved with the index, so queries
+    go through exactly the same transform at search time.
+    """
+
+    def __init__(
+        self,
+        embeddings=None,
+        index_path: Optional[str] = None,
+        num_shards: Optional[int] = None,
+        shard_key: Optional[str] = None,
+        mmap: bool = False,
+        reduction: Optional[str] = None,
+        reduced_dim: Optional[int] = None,
+        quantization: Optional[str] = None
+    ):
+        """Initialize the vector store.
+
+        Args:
+            embeddings: Embeddings model (defaults to the configured HuggingFace model)
+            index_path: Base path of the index on disk
+            num_shards: Number of shards (defaults to VECTOR_STORE_SHARDS)
+            shard_key: Metadata field used to route documents to shards
+            mmap: Memory-map index files read-only instead of reading them into RAM
+            reduction: "pca" or "truncate" to reduce vector dimensionality when
+                building (defaults to INDEX_REDUCTION; "none" disables it)
+            reduced_dim: Dimensions kept by the reduction (defaults to INDEX_REDUCED_DIM)
+            quantization: "fp16" or "int8" scalar-quantized storage (defaults to
+                INDEX_QUANTIZATION; "none" stores float32)
+        """
+        self.embeddings = embeddings or HuggingFaceEmbeddings(
             model_name=settings.EMBEDDING_MODEL
         )
-        self.db = None
-        self.index_path = "data/vector_store.index"  
+        self.index_path = index_path or settings.VECTOR_STORE_PATH
+        self.num_shards = max(1, num_shards or settings.VECTOR_STORE_SHARDS)
+        self.shard_key = shard_key or settings.SHARD_KEY
+        self.mmap = mmap
+        self.reduction = self._option(reduction or settings.INDEX_REDUCTION, _REDUCTIONS, "reduction")
+        self.reduced_dim = reduced_dim or settings.INDEX_REDUCED_DIM
+        self.quantization = self._option(quantization or settings.INDEX_QUANTIZATION, _QUANTIZERS, "quantization")
+        self.logger = logging.getLogger(__name__)
+        self.shards: List[Optional[FAISS]] = [None] * self.num_shards
+        # Shards whose vectors are memory-mapped from disk rather than held in RAM
+        self._mapped: "weakref.WeakSet[FAISS]" = weakref.WeakSet()
+        # Empty trained index every compressed shard is cloned from, so all shards
+        # share one reduced space and their distances can be merged
+        self._template: Optional[faiss.Index] = None
+        self.embedding_cache = LRUCache(settings.EMBEDDING_CACHE_SIZE, name="embeddings")
+        self.search_cache = LRUCache(settings.SEARCH_CACHE_SIZE, name="search")
+        # Serializes writers (rebuilds, live updates, snapshots); readers take no lock
+        self._write_lock = threading.Lock()
+        # Guards the generation counter together with search cache clears and puts
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        # FAISS releases the GIL while searching, so threads give real parallelism
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.num_shards, thread_name_prefix="faiss-shard")
+            if self.num_shards > 1 else None
+        )
         self._configure_pickle()
-        
+
+    @staticmethod
+    def _option(value: str, choices, name: str) -> Optional[str]:
+        """Normalize an index build option; "none" means disabled."""
+        value = value.lower()
+        if value == "none":
+            return None
+        if value not in choices:
+            raise ValueError(f"Unknown index {name} '{value}', expected none or one of {tuple(choices)}")
+        return value
+
     def _configure_pickle(self):
         """Configure pickle settings to avoid warnings for the example."""
         import warnings
         warnings.filterwarnings("ignore", message=".*deterministic.*")
-        
+
         # This is only for demonstration purposes; in production, is necessary to use a more secure protocol.
         pickle.DEFAULT_PROTOCOL = pickle.HIGHEST_PROTOCOL
 
+    def shard_path(self, shard_id: int) -> str:
+        """Return the folder holding a shard.
+
+        A single-shard store keeps the historical layout at ``index_path``.
+        """
+        if self.num_shards == 1:
+            return self.index_path
+        return os.path.join(self.index_path, f"shard_{shard_id:03d}")
+
+    def shard_for(self, document: Document) -> int:
+        """Return the shard a document belongs to.
+
+        Uses a stable hash (crc32) of the shard key so routing survives restarts.
+        Documents without the key are routed by their content.
+        """
+        if self.num_shards == 1:
+            return 0
+        key = document.metadata.get(self.shard_key) or document.page_content
+        return zlib.crc32(str(key).encode("utf-8")) % self.num_shards
+
+    def partition(self, documents: List[Document]) -> List[List[Document]]:
+        """Split documents into one list per shard."""
+        partitions = [[] for _ in range(self.num_shards)]
+        for doc in documents:
+            partitions[self.shard_for(doc)].append(doc)
+        return partitions
+
     def index_documents(self, documents):
-        """Index documents into the vector store."""
-        self.db = FAISS.from_documents(documents, self.embeddings)
-        self._save_index()
-    
+        """Index documents into the vector store, rebuilding every shard."""
+        with self._write_lock:
+            if self.reduction is None and self.quantization is None:
+                for shard_id, shard_docs in enumerate(self.partition(documents)):
+                    self._build_shard(shard_id, shard_docs)
+                return
+            # Train the reduction/quantizer once over the whole corpus, not per shard
+            documents = list(documents)
+            vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+            self._template = self._new_index(np.asarray(vectors, dtype=np.float32)) if documents else None
+            partitions = [[] for _ in range(self.num_shards)]
+            for doc, vector in zip(documents, vectors):
+                partitions[self.shard_for(doc)].append((doc, vector))
+            for shard_id, pairs in enumerate(partitions):
+                self._build_shard(shard_id, [doc for doc, _ in pairs], [vector for _, vector in pairs])
+
+    def rebuild_shard(self, shard_id: int, documents: List[Document]):
+        """Rebuild a single shard, leaving the others untouched.
+
+        Args:
+            shard_id: Shard to rebuild
+            documents: Candidate documents; those routed to other shards are ignored
+        """
+        if not 0 <= shard_id < self.num_shards:
+            raise ValueError(f"Invalid shard id {shard_id} (store has {self.num_shards} shards)")
+        with self._write_lock:
+            self._build_shard(shard_id, [doc for doc in documents if self.shard_for(doc) == shard_id])
+
+    def _build_shard(self, shard_id: int, documents: List[Document], vectors: Optional[List[List[float]]] = None):
+        """Build a shard from its documents (and their vectors, if already embedded) and persist it."""
+        if not documents:
+            self.shards[shard_id] = None
+        elif self.reduction is None and self.quantization is None:
+            self.shards[shard_id] = FAISS.from_documents(documents, self.embeddings)
+        else:
+            texts = [doc.page_content for doc in documents]
+            if vectors is None:
+                vectors = self.embeddings.embed_documents(texts)
+            self.shards[shard_id] = self._create_shard(
+                list(zip(texts, vectors)),
+                [doc.metadata for doc in documents]
+            )
+        self._save_shard(shard_id)
+        self._invalidate_results()
+
+    def apply_changes(
+        self,
+        upserts: Iterable[Tuple[Document, List[float]]] = (),
+        deletes: Iterable[str] = ()
+    ):
+        """Apply live document changes without blocking searches.
+
+        Every affected shard is copied, modified and swapped in. An upsert
+        replaces all chunks with the same ``source``, so replaying a change
+        twice is harmless.
+
+        A chunk collapsed from near-duplicates (``sources`` metadata) only
+        loses the removed names: it is rewritten for the remaining sources,
+        re-electing its ``source`` if needed, and dropped once none is left.
+
+        Args:
+            upserts: (document, embedding) pairs to add or replace
+            deletes: Source names whose chunks are removed
+        """
+        upserts = list(upserts)
+        removed_sources = set(deletes) | {doc.metadata.get("source") for doc, _ in upserts}
+        added = [[] for _ in range(self.num_shards)]
+        for doc, embedding in upserts:
+            added[self.shard_for(doc)].append((doc, embedding))
+
+        with self._write_lock:
+            for shard_id, current in enumerate(self.shards):
+                stale_ids, rewritten = [], {}
+                for docstore_id, doc in (current.docstore._dict.items() if current is not None else ()):
+                    names = doc.metadata.get("sources") or [doc.metadata.get("source")]
+                    if removed_sources.isdisjoint(names):
+                        continue
+                    remaining = [name for name in names if name not in removed_sources]
+                    if remaining:
+                        rewritten[docstore_id] = self._retain_sources(doc, remaining)
+                    else:
+                        stale_ids.append(docstore_id)
+                if not stale_ids and not rewritten and not added[shard_id]:
+                    continue
+                updated = self._copy_shard(current) if current is not None else None
+                if rewritten:
+                    # The copy owns its docstore dict; the old shard keeps its documents
+                    updated.docstore._dict.update(rewritten)
+                if stale_ids:
+                    updated.delete(stale_ids)
+                if added[shard_id]:
+                    text_embeddings = [(doc.page_content, embedding) for doc, embedding in added[shard_id]]
+                    metadatas = [doc.metadata for doc, _ in added[shard_id]]
+                    if updated is None:
+                        updated = self._create_shard(text_embeddings, metadatas)
+                    else:
+                        updated.add_embeddings(text_embeddings, metadatas=metadatas)
+                # Single reference assignment: searches see the old or the new shard, never a partial one
+                self.shards[shard_id] = updated if updated.index.ntotal else None
+            self._invalidate_results()
+
+    @staticmethod
+    def _retain_sources(doc: Document, remaining: List[str]) -> Document:
+        """Copy of a collapsed chunk that only cites the ``remaining`` sources.
+
+        The chunk keeps its text and vector (the cluster members were near
+        duplicates of it); the first remaining source becomes the keeper when
+        the original one was removed.
+        """
+        metadata = {key: value for key, value in doc.metadata.items() if key not in ("sources", "duplicates")}
+        if metadata.get("source") not in remaining:
+            metadata["source"] = remaining[0]
+        if len(remaining) > 1:
+            metadata.update(sources=remaining, duplicates=len(remaining) - 1)
+        return Document(page_content=doc.page_content, metadata=metadata)
+
+    def _invalidate_results(self):
+        """Start a new generation and drop the cached search results (write lock held)."""
+        with self._generation_lock:
+            self._generation += 1
+            self.search_cache.clear()
+
+    def _cache_results(self, key, documents: List[Document], generation: int, cost_ms: float):
+        """Cache search results unless the index changed since ``generation``."""
+        with self._generation_lock:
+            if self._generation == generation:
+                self.search_cache.put(key, documents, cost_ms=cost_ms)
+
+    def _create_shard(self, text_embeddings: List[Tuple[str, List[float]]], metadatas: List[dict]) -> FAISS:
+        """Create a shard from precomputed embeddings with the configured index type."""
+        if self.reduction is None and self.quantization is None:
+            return FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas)
+        vectors = np.asarray([embedding for _, embedding in text_embeddings], dtype=np.float32)
+        db = FAISS(self.embeddings, self._shard_index(vectors), InMemoryDocstore(), {})
+        db.add_embeddings(text_embeddings, metadatas=metadatas)
+        return db
+
+    def _shard_index(self, vectors: np.ndarray) -> faiss.Index:
+        """Return an empty index in the store's shared space (write lock held).
+
+        The space comes from the last full build, or from an existing shard after
+        a reload; only an empty store trains a new one, on ``vectors``.
+        """
+        if self._template is None:
+            existing = next((db for db in self.shards if db is not None), None)
+            if existing is not None:
+                # Copy first so neither the live nor a memory-mapped shard is reset
+                template = faiss.deserialize_index(faiss.serialize_index(existing.index))
+                template.reset()
+                self._template = template
+            else:
+                self._template = self._new_index(vectors)
+        # clone_index does not support every transform (e.g. RemapDimensionsTransform)
+        return faiss.deserialize_index(faiss.serialize_index(self._template))
+
+    def _new_index(self, vectors: np.ndarray) -> faiss.Index:
+        """Build and train a reduced and/or scalar-quantized L2 index for ``vectors``."""
+        dim = vectors.shape[1]
+        reduced_dim = min(self.reduced_dim, dim)
+        reduction = self.reduction
+        if reduction == "pca" and len(vectors) < reduced_dim:
+            # PCA needs at least as many training vectors as output dimensions
+            self.logger.warning(
+                f"Only {len(vectors)} vectors to train a {reduced_dim}-d PCA, storing the index unreduced"
+            )
+            reduction = None
+        out_dim = reduced_dim if reduction else dim
+
+        if self.quantization:
+            index = faiss.IndexScalarQuantizer(out_dim, _QUANTIZERS[self.quantization], faiss.METRIC_L2)
+        else:
+            index = faiss.IndexFlatL2(out_dim)
+        if reduction:
+            index = faiss.IndexPreTransform(index)
+            if reduction == "pca":
+                index.prepend_transform(faiss.PCAMatrix(dim, out_dim))
+            else:
+                # Matryoshka-style: keep the leading dimensions, then renormalize
+                index.prepend_transform(faiss.NormalizationTransform(out_dim))
+                index.prepend_transform(faiss.RemapDimensionsTransform(dim, out_dim, False))
+        index.train(vectors)
+        return index
+
+    def _copy_shard(self, db: FAISS) -> FAISS:
+        """Return an independent, writable copy of a shard."""
+        if self.mmap:
+            # clone_index would share the read-only mapped buffer; round-trip to own the data
+            index = faiss.deserialize_index(faiss.serialize_index(db.index))
+        else:
+            index = faiss.clone_index(db.index)
+        return FAISS(
+            self.embeddings,
+            index,
+            InMemoryDocstore(dict(db.docstore._dict)),
+            dict(db.index_to_docstore_id)
+        )
+
+    def save_snapshot(self):
+        """Persist a consistent snapshot of every shard."""
+        with self._write_lock:
+            self._save_index()
+
     def _save_index(self):
-        """Save the index to the specified path with security checks."""
-        self.db.save_local(self.index_path)
-    
+        """Save every shard to disk."""
+        for shard_id in range(self.num_shards):
+            self._save_shard(shard_id)
+
+    def _save_shard(self, shard_id: int):
+        """Save a shard to its folder with security checks."""
+        path = self.shard_path(shard_id)
+        if self.shards[shard_id] is not None:
+            # Write under temporary names and rename into place: the old files may
+            # still be memory-mapped by a live index, and a rename keeps them intact
+            self.shards[shard_id].save_local(path, index_name="index.tmp")
+            for extension in ("faiss", "pkl"):
+                os.replace(os.path.join(path, f"index.tmp.{extension}"), os.path.join(path, f"index.{extension}"))
+        else:
+            # An empty shard has no FAISS index; drop any stale copy on disk
+            shutil.rmtree(path, ignore_errors=True)
+
     def load_index(self):
-        """Charge the index from the specified path."""
-        if os.path.exists(self.index_path):
+        """Charge the index from the specified path, one shard at a time."""
+        self._template = None
+        for shard_id in range(self.num_shards):
+            path = self.shard_path(shard_id)
+            if not os.path.exists(os.path.join(path, "index.faiss")):
+                continue
             try:
-                self.db = FAISS.load_local(
-                    self.index_path, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True  # Necesario en versiones recientes
-                )
+                self.shards[shard_id] = self._load_shard(path)
             except Exception as e:
                 raise ValueError(f"Error cargando índice: {str(e)}")
+            if self.mmap:
+                self._mapped.add(self.shards[shard_id])
+
+    def _load_shard(self, path: str) -> FAISS:
+        """Load one shard folder, memory-mapping the FAISS file when enabled."""
+        if not self.mmap:
+            return FAISS.load_local(
+                path,
+                self.embeddings,
+                allow_dangerous_deserialization=True  # Necesario en versiones recientes
+            )
+        index_file = os.path.join(path, "index.faiss")
+        # Maps the flat code arrays in place; only pages that are searched become resident.
+        # Older FAISS builds lack the flag (or reject it for some index types)
+        mmap_ifc = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+        index = None
+        if mmap_ifc is not None:
+            try:
+                index = faiss.read_index(index_file, mmap_ifc | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                pass
+        if index is None:
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        with open(os.path.join(path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+
+    def estimated_bytes(self) -> int:
+        """Rough resident memory of the loaded shards (vectors + stored text).
+
+        Vectors of memory-mapped shards live in the OS page cache, which the
+        kernel can reclaim, so they are left out and reported by
+        ``mapped_bytes`` instead.
+        """
+        total = 0
+        for db in self.shards:
+            if db is None:
+                continue
+            if db not in self._mapped:
+                total += self._vector_bytes(db)
+            total += sum(
+                len(doc.page_content) + len(str(doc.metadata))
+                for doc in db.docstore._dict.values()
+            )
+        return total
+
+    def mapped_bytes(self) -> int:
+        """Size of the vectors served from memory-mapped index files."""
+        return sum(self._vector_bytes(db) for db in self.shards if db is not None and db in self._mapped)
 
-    
-    def search(self, query: str, top_k: int = None):
-        if not self.db:
-            self.load_index() 
-        if not self.db:
+    @staticmethod
+    def _vector_bytes(db: FAISS) -> int:
+        """Bytes taken by the stored vector codes of a shard."""
+        try:
+            code_size = db.index.sa_code_size()
+        except RuntimeError:
+            code_size = db.index.d * 4
+        return db.index.ntotal * code_size
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing cached embeddings."""
+        embedding = self.embedding_cache.get(query)
+        if embedding is None:
+            start = time.perf_counter()
+            with span("embedding"):
+                embedding = self.embeddings.embed_query(query)
+            self.embedding_cache.put(query, embedding, cost_ms=(time.perf_counter() - start) * 1000)
+        return embedding
+
+    def search(self, query: str, top_k: int = None) -> List[Document]:
+        """Scatter the query to every shard and gather a global top-k.
+
+        Args:
+            query: Search query
+            top_k: Number of documents to return (defaults to TOP_K)
+
+        Returns:
+            Documents ordered by increasing distance to the query
+        """
+        self._require_index()
+        k = top_k or settings.TOP_K
+        cached = self.search_cache.get((query, k))
+        if cached is not None:
+            return list(cached)
+        generation = self._generation
+        start = time.perf_counter()
+        embedding = self.embed_query(query)
+        hits = self._gather(self._search_shard, embedding, k)
+        documents = [doc for doc, _ in hits]
+        self._cache_results((query, k), documents, generation, (time.perf_counter() - start) * 1000)
+        return list(documents)
+
+    def search_mmr(
+        self,
+        query: str,
+        top_k: int = None,
+        fetch_k: int = None,
+        lambda_mult: float = 0.5
+    ) -> List[Document]:
+        """Search, then diversify the candidates by maximal marginal relevance.
+
+        The ``fetch_k`` nearest candidates are gathered together with their
+        vectors, reconstructed from the FAISS index instead of re-embedding
+        the documents, and ``top_k`` of them are picked with ``mmr_select``.
+
+        Args:
+            query: Search query
+            top_k: Number of documents to return (defaults to TOP_K)
+            fetch_k: Size of the candidate pool (defaults to MMR_FETCH_K)
+            lambda_mult: Relevance/diversity trade-off, 1.0 is plain search
+
+        Returns:
+            Documents in MMR selection order
+        """
+        self._require_index()
+        k = top_k or settings.TOP_K
+        fetch_k = max(fetch_k or settings.MMR_FETCH_K, k)
+        cache_key = ("mmr", query, k, fetch_k, lambda_mult)
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        generation = self._generation
+        start = time.perf_counter()
+        embedding = self.embed_query(query)
+        hits = self._gather(self._search_shard_with_vectors, embedding, fetch_k)
+        with span("mmr", candidates=len(hits)):
+            selected = mmr_select(
+                np.asarray(embedding, dtype=np.float32),
+                np.vstack([vector for _, _, vector in hits]) if hits else np.empty((0, 1), dtype=np.float32),
+                k,
+                lambda_mult
+            )
+        documents = [hits[i][0] for i in selected]
+        self._cache_results(cache_key, documents, generation, (time.perf_counter() - start) * 1000)
+        return list(documents)
+
+    def _require_index(self):
+        """Load the index on first use; fail if nothing has been indexed."""
+        if not any(self.shards):
+            self.load_index()
+        if not any(self.shards):
             raise ValueError("Vector store not initialized. Please index documents first.")
-        return self.db.similarity_search(query, k=top_k or settings.TOP_K)
\ No newline at end of file
+
+    def _gather(self, search_shard, embedding: List[float], k: int) -> List[tuple]:
+        """Run ``search_shard`` on every shard and merge the global top-k hits."""
+        shards = [(shard_id, db) for shard_id, db in enumerate(self.shards) if db is not None]
+        if len(shards) == 1:
+            hits = search_shard(*shards[0], embedding, k)
+        else:
+            # Copy the context so spans recorded in pool threads join the request trace
+            futures = [
+                self._executor.submit(
+                    contextvars.copy_context().run, search_shard, shard_id, db, embedding, k
+                )
+                for shard_id, db in shards
+            ]
+            hits = [hit for future in futures for hit in future.result()]
+        # Every shard returns L2 distances in the same space, so they merge directly
+        return heapq.nsmallest(k, hits, key=lambda hit: hit[1])
+
+    def _search_shard(self, shard_id: int, db: FAISS, embedding: List[float], k: int):
+        """Search a single shard, returning (document, distance) pairs."""
+        with span("faiss.search", shard=shard_id):
+            return db.similarity_search_with_score_by_vector(embedding, k=k)
+
+    def _search_shard_with_vectors(self, shard_id: int, db: FAISS, embedding: List[float], k: int):
+        """Search a single shard, returning (document, distance, stored vector) triples."""
+        with span("faiss.search", shard=shard_id):
+            distances, ids = db.index.search(np.asarray([embedding], dtype=np.float32), k)
+            found = ids[0] != -1
+            ids, distances = ids[0][found], distances[0][found]
+            vectors = db.index.reconstruct_batch(ids) if len(ids) else []
+            return [
+                (db.docstore.search(db.index_to_docstore_id[int(i)]), float(distance), vector)
+                for i, distance, vector in zip(ids, distances, vectors)
+            ]
+
+    def cache_stats(self) -> List[dict]:
+        """Return hit-rate stats of the embedding and search caches."""
+        return [self.embedding_cache.stats(), self.search_cache.stats()]
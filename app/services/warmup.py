@@ -0,0 +1,79 @@
+# app/services/warmup.py
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import time
+from app.agents.retriever import RetrieverAgent
+from app.agents.responder import ResponderAgent
+from app.services.query_log import QueryLog
+
+
+class CacheWarmer:
+    """Pre-computes caches for the most frequent historical queries.
+
+    Running a popular query through the retriever, against the catalog it
+    was asked on, fills the embedding and retrieval caches of that catalog's
+    vector store; optionally running the responder
+    fills the LLM response cache as well. Answers go through the LLM
+    scheduler as the ``batch`` class, so warm-up never takes the capacity
+    reserved for interactive traffic. Work stops once the time budget is
+    spent so a large history never holds up readiness.
+    """
+
+    def __init__(
+        self,
+        query_log: QueryLog,
+        retriever: RetrieverAgent,
+        responder: Optional[ResponderAgent] = None
+    ):
+        """Initialize the warmer.
+
+        Args:
+            query_log: Source of query frequency stats
+            retriever: Retriever whose caches are warmed
+            responder: Optional responder used to warm LLM answers
+        """
+        self.query_log = query_log
+        self.retriever = retriever
+        self.responder = responder
+        self.logger = logging.getLogger(__name__)
+
+    async def warm(self, top_n: int, time_budget_s: float, warm_answers: bool = False) -> Dict[str, Any]:
+        """Warm caches for the top-N queries within a time budget.
+
+        Args:
+            top_n: Number of most frequent queries to warm
+            time_budget_s: Wall-clock budget in seconds
+            warm_answers: Also generate (and cache) LLM answers
+
+        Returns:
+            Report with the number of queries warmed, failures and elapsed time
+        """
+        start = time.monotonic()
+        candidates = self.query_log.top(top_n)
+        warmed = failed = 0
+        budget_exhausted = False
+
+        for query, catalog_id, _count in candidates:
+            if time.monotonic() - start >= time_budget_s:
+                budget_exhausted = True
+                break
+            try:
+                documents = await asyncio.to_thread(self.retriever.retrieve, query, catalog_id=catalog_id)
+                if warm_answers and self.responder is not None:
+                    await self.responder.agenerate_response(query, documents, priority="batch")
+                warmed += 1
+            except Exception as e:
+                failed += 1
+                self.logger.warning(f"Warm-up failed for query '{query[:50]}': {str(e)}")
+
+        report = {
+            "candidates": len(candidates),
+            "warmed": warmed,
+            "failed": failed,
+            "answers_warmed": warm_answers and self.responder is not None,
+            "budget_exhausted": budget_exhausted,
+            "elapsed_s": round(time.monotonic() - start, 3),
+        }
+        self.logger.info(f"Cache warm-up finished: {report}")
+        return report
@@ -0,0 +1,121 @@
+# scripts/bench_compression.py
+"""Footprint, speed and recall of the reduced-footprint index settings.
+
+The same synthetic catalog is indexed once per setting (dimensionality
+reduction x scalar quantization). Each setting is compared with the full
+float32 index: compression ratio of the stored vectors, search latency
+speed-up and recall@k of the exact top-k.
+
+Random vectors have no low-dimensional structure, so with
+``--random-vectors`` the PCA and truncation rows understate the recall that
+real sentence embeddings keep.
+
+Usage:
+    python -m scripts.bench_compression --docs 50000 --reduced-dim 128 --top-k 3 10
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from app.services.vector_store import VectorStoreService
+from scripts.bench_utils import (
+    RandomEmbeddings, percentiles, synthetic_documents, synthetic_queries, time_calls
+)
+
+SETTINGS = [
+    ("none", "none"), ("none", "fp16"), ("none", "int8"),
+    ("pca", "none"), ("pca", "fp16"), ("pca", "int8"),
+    ("truncate", "none"), ("truncate", "int8"),
+]
+
+
+def build(embeddings, documents, tmp: str, reduction: str, quantization: str, reduced_dim: int):
+    store = VectorStoreService(
+        embeddings=embeddings,
+        index_path=os.path.join(tmp, f"{reduction}_{quantization}"),
+        num_shards=1,
+        reduction=reduction,
+        reduced_dim=reduced_dim,
+        quantization=quantization
+    )
+    store.search_cache.maxsize = 0
+    store.index_documents(documents)
+    return store
+
+
+def vector_bytes(store: VectorStoreService) -> int:
+    index = store.shards[0].index
+    return index.ntotal * index.sa_code_size()
+
+
+def run(args, embeddings) -> list:
+    documents = synthetic_documents(args.docs)
+    queries = synthetic_queries(args.queries)
+    k_max = max(args.top_k)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = build(embeddings, documents, tmp, "none", "none", args.reduced_dim)
+        for query in queries:  # keep query embedding out of the timings
+            baseline.embed_query(query)
+        exact = {query: [doc.metadata["source"] for doc in baseline.search(query, top_k=k_max)] for query in queries}
+        baseline_ms = percentiles(time_calls(lambda q: baseline.search(q, top_k=k_max), queries))
+        baseline_bytes = vector_bytes(baseline)
+
+        for reduction, quantization in SETTINGS:
+            store = baseline if (reduction, quantization) == ("none", "none") else build(
+                embeddings, documents, tmp, reduction, quantization, args.reduced_dim
+            )
+            store.embedding_cache = baseline.embedding_cache
+            search_ms = percentiles(time_calls(lambda q: store.search(q, top_k=k_max), queries))
+            found = {query: [doc.metadata["source"] for doc in store.search(query, top_k=k_max)] for query in queries}
+            recall = {
+                str(k): round(sum(
+                    len(set(found[query][:k]) & set(exact[query][:k])) for query in queries
+                ) / (k * len(queries)), 4)
+                for k in args.top_k
+            }
+            result = {
+                "reduction": reduction,
+                "quantization": quantization,
+                "bytes_per_vector": store.shards[0].index.sa_code_size(),
+                "compression_ratio": round(baseline_bytes / vector_bytes(store), 2),
+                "search_ms": search_ms,
+                "speedup_p50": round(baseline_ms["p50"] / max(search_ms["p50"], 1e-9), 2),
+                "recall": recall,
+            }
+            results.append(result)
+            print(
+                f"{reduction:<9} {quantization:<5} {result['bytes_per_vector']:>5}B/vec "
+                f"x{result['compression_ratio']:<6} speed-up x{result['speedup_p50']:<5} "
+                + " ".join(f"recall@{k}={v:.3f}" for k, v in recall.items())
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--reduced-dim", type=int, default=128)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 10])
+    parser.add_argument("--random-vectors", action="store_true",
+                        help="Use deterministic random vectors instead of the embedding model")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    embeddings = RandomEmbeddings() if args.random_vectors else None
+    if embeddings is None:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from app.config import settings
+        embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+
+    results = run(args, embeddings)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"reduced_dim": args.reduced_dim, "docs": args.docs, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# scripts/bench_executor.py
+"""Orchestration framework overhead: LangGraph vs the direct executor.
+
+The retriever searches a stub vector store returning fixed documents and the
+responder answers instantly, so what is measured is the cost of the
+orchestration layer itself (graph execution, Runnable chain, callbacks and
+state handling). For each executor the per-request latency and the bytes
+allocated per request (tracemalloc) are reported.
+
+Usage:
+    python -m scripts.bench_executor --requests 2000 --output bench_executor.json
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from langchain.docstore.document import Document
+
+from app.agents.orchestrator import Orchestrator
+from app.agents.retriever import RetrieverAgent
+from scripts.bench_utils import percentiles, synthetic_queries
+
+
+class StubVectorStore:
+    """Returns the same documents for every query."""
+
+    def __init__(self, top_k: int = 3):
+        self.documents = [
+            Document(page_content=f"Product {i} description", metadata={"source": f"product_{i}.txt"})
+            for i in range(top_k)
+        ]
+
+    def search(self, query, top_k=None):
+        return self.documents
+
+
+class StubResponder:
+    """Answers instantly without calling an LLM."""
+
+    async def agenerate_response(self, query, documents):
+        return f"Answer to '{query}' from {len(documents)} documents"
+
+    def degraded_response(self, query, documents):
+        return "degraded"
+
+
+def build(executor: str) -> Orchestrator:
+    retriever = RetrieverAgent(StubVectorStore(), direct=executor == "direct")
+    return Orchestrator(retriever, StubResponder(), executor=executor)
+
+
+async def measure(orchestrator: Orchestrator, queries, warmup: int) -> dict:
+    for query in queries[:warmup]:
+        await orchestrator.process_query(query)
+
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        await orchestrator.process_query(query)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    # Allocation profile in a separate pass: tracemalloc slows every allocation down
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    peak = 0
+    for query in queries:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await orchestrator.process_query(query)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {
+        "latency_ms": percentiles(samples),
+        "peak_transient_bytes_per_request": peak,
+        "retained_bytes_per_request": round(allocated / len(queries), 1),
+        "retained_blocks_per_request": round(blocks / len(queries), 2),
+    }
+
+
+async def run(args) -> dict:
+    queries = synthetic_queries(args.requests)
+    results = {}
+    for executor in ("langgraph", "direct"):
+        orchestrator = build(executor)
+        # Identical answers are a precondition for comparing the two
+        assert await orchestrator.process_query(queries[0]) == await build("langgraph").process_query(queries[0])
+        results[executor] = await measure(orchestrator, queries, args.warmup)
+        latency = results[executor]["latency_ms"]
+        print(
+            f"{executor:<10} mean={latency['mean']:.3f}ms p50={latency['p50']:.3f}ms p95={latency['p95']:.3f}ms "
+            f"peak={results[executor]['peak_transient_bytes_per_request'] / 1024:.1f}KiB/request"
+        )
+    results["speedup_p50"] = round(
+        results["langgraph"]["latency_ms"]["p50"] / max(results["direct"]["latency_ms"]["p50"], 1e-9), 2
+    )
+    print(f"Direct executor p50 speed-up: {results['speedup_p50']}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
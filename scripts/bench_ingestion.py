@@ -0,0 +1,100 @@
+# scripts/bench_ingestion.py
+"""Query latency while documents are ingested through the live ingestion path.
+
+Search latency is measured on an idle index and again while a producer
+thread floods IngestionService with uploads and deletions.
+
+Usage:
+    python -m scripts.bench_ingestion --docs 50000 --shards 4
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from app.services.ingestion import IngestionService, WriteAheadLog
+from app.services.vector_store import VectorStoreService
+from scripts.bench_utils import (
+    RandomEmbeddings, percentiles, synthetic_documents, synthetic_queries, time_calls
+)
+
+
+def run(num_docs: int, num_shards: int, num_queries: int, batch_size: int, duration_s: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStoreService(
+            embeddings=RandomEmbeddings(),
+            index_path=os.path.join(tmp, "vector_store.index"),
+            num_shards=num_shards
+        )
+        store.search_cache.maxsize = 0
+        store.index_documents(synthetic_documents(num_docs))
+        queries = synthetic_queries(num_queries)
+
+        store.search(queries[0])
+        idle = percentiles(time_calls(store.search, queries))
+
+        service = IngestionService(
+            store, WriteAheadLog(os.path.join(tmp, "ingest.wal")),
+            batch_size=batch_size, batch_wait_s=0.05, compaction_interval_s=duration_s / 2
+        )
+        service.start()
+        stop = threading.Event()
+        submitted = [0]
+
+        def produce():
+            new_docs = synthetic_documents(num_docs * 2, seed=7)[num_docs:]
+            for i, doc in enumerate(new_docs):
+                if stop.is_set():
+                    break
+                if i % 10 == 9:
+                    service.submit_delete(f"product_{i:07d}.txt")
+                service.submit_upsert(f"live_{i:07d}.txt", doc.page_content, {"category": doc.metadata["category"]})
+                submitted[0] += 1
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        start = time.perf_counter()
+        busy_samples = []
+        while time.perf_counter() - start < duration_s:
+            busy_samples.extend(time_calls(store.search, queries))
+        stop.set()
+        producer.join()
+        applied_before_stop = service.applied_seq
+        elapsed = time.perf_counter() - start
+        service.stop()
+
+    report = {
+        "docs": num_docs,
+        "shards": num_shards,
+        "search_ms_idle": idle,
+        "search_ms_during_ingestion": percentiles(busy_samples),
+        "changes_submitted": submitted[0],
+        "changes_applied_per_s": round(applied_before_stop / elapsed, 1),
+        "batches": service.batches,
+        "compactions": service.compactions,
+    }
+    print(
+        f"idle p50={idle['p50']:.3f}ms p95={idle['p95']:.3f}ms | during ingestion "
+        f"p50={report['search_ms_during_ingestion']['p50']:.3f}ms "
+        f"p95={report['search_ms_during_ingestion']['p95']:.3f}ms | "
+        f"{report['changes_applied_per_s']} changes/s applied"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of concurrent ingestion")
+    parser.add_argument("--output", help="Optional JSON output file")
+    args = parser.parse_args()
+
+    result = run(args.docs, args.shards, args.queries, args.batch_size, args.duration)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
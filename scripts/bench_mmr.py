@@ -0,0 +1,93 @@
+# scripts/bench_mmr.py
+"""Cost of the MMR diversification stage.
+
+``mmr_select`` is timed on random candidate pools of several sizes, next to
+LangChain's ``maximal_marginal_relevance`` as a reference. Then plain
+``search`` and ``search_mmr`` are compared end to end on a synthetic
+catalog, with the caches disabled.
+
+Usage:
+    python -m scripts.bench_mmr --pools 25 50 100 200 --docs 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+
+from app.services.mmr import mmr_select
+from app.services.vector_store import VectorStoreService
+from scripts.bench_utils import (
+    RandomEmbeddings, percentiles, synthetic_documents, synthetic_queries, time_calls
+)
+
+
+def bench_select(pool: int, dimension: int, k: int, repeats: int = 200) -> dict:
+    rng = np.random.default_rng(pool)
+    cases = [
+        (rng.standard_normal(dimension).astype(np.float32),
+         rng.standard_normal((pool, dimension)).astype(np.float32))
+        for _ in range(repeats)
+    ]
+    return {
+        "pool": pool,
+        "mmr_select_ms": percentiles(time_calls(lambda case: mmr_select(case[0], case[1], k), cases)),
+        "langchain_ms": percentiles(time_calls(
+            lambda case: maximal_marginal_relevance(case[0], case[1], k=k), cases
+        )),
+    }
+
+
+def bench_search(num_docs: int, fetch_k: int, k: int, num_queries: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStoreService(
+            embeddings=RandomEmbeddings(), index_path=os.path.join(tmp, "vector_store.index"), num_shards=1
+        )
+        store.search_cache.maxsize = 0
+        store.index_documents(synthetic_documents(num_docs))
+        queries = synthetic_queries(num_queries)
+        for query in queries:  # keep query embedding out of the comparison
+            store.embed_query(query)
+        return {
+            "docs": num_docs,
+            "fetch_k": fetch_k,
+            "search_ms": percentiles(time_calls(lambda q: store.search(q, top_k=k), queries)),
+            "search_mmr_ms": percentiles(time_calls(
+                lambda q: store.search_mmr(q, top_k=k, fetch_k=fetch_k), queries
+            )),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pools", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = {"select": [], "search": None}
+    for pool in args.pools:
+        result = bench_select(pool, args.dimension, args.top_k)
+        report["select"].append(result)
+        print(
+            f"pool={pool:<5} mmr_select p50={result['mmr_select_ms']['p50']:.4f}ms "
+            f"p95={result['mmr_select_ms']['p95']:.4f}ms  langchain p50={result['langchain_ms']['p50']:.4f}ms"
+        )
+    report["search"] = bench_search(args.docs, max(args.pools), args.top_k, args.queries)
+    print(
+        f"docs={args.docs} search p50={report['search']['search_ms']['p50']:.3f}ms "
+        f"search_mmr(fetch_k={max(args.pools)}) p50={report['search']['search_mmr_ms']['p50']:.3f}ms"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# scripts/bench_retrieval_scaling.py
+"""Retrieval scaling micro-benchmarks on synthetic product catalogs.
+
+For every corpus size the VectorStoreService is built, saved, reloaded and
+searched; build time, on-disk size, load time, RSS and search latency
+percentiles at several TOP_K values are written as JSON so runs can be
+compared across commits.
+
+Usage:
+    python -m scripts.bench_retrieval_scaling --sizes 1000 10000 100000 1000000 \\
+        --random-vectors --output bench_results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import faiss
+
+from app.services.vector_store import VectorStoreService
+from scripts.bench_utils import (
+    RandomEmbeddings, percentiles, synthetic_documents, synthetic_queries, time_calls
+)
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (Linux), falling back to the peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def disk_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def make_store(embeddings, path: str, args) -> VectorStoreService:
+    store = VectorStoreService(
+        embeddings=embeddings, index_path=path, num_shards=args.shards, mmap=args.mmap
+    )
+    # Measure the index, not the caches
+    store.embedding_cache.maxsize = 0
+    store.search_cache.maxsize = 0
+    return store
+
+
+def bench_size(size: int, embeddings, queries, args) -> dict:
+    documents = synthetic_documents(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vector_store.index")
+
+        store = make_store(embeddings, path, args)
+        start = time.perf_counter()
+        store.index_documents(documents)
+        build_s = time.perf_counter() - start
+        del store, documents
+        gc.collect()
+
+        rss_before = rss_mb()
+        store = make_store(embeddings, path, args)
+        start = time.perf_counter()
+        store.load_index()
+        load_s = time.perf_counter() - start
+        rss_after = rss_mb()
+
+        embed_ms = percentiles(time_calls(embeddings.embed_query, queries))
+        search_ms = {}
+        for top_k in args.top_k:
+            store.search(queries[0], top_k=top_k)  # warm-up
+            search_ms[str(top_k)] = percentiles(
+                time_calls(lambda q: store.search(q, top_k=top_k), queries)
+            )
+
+        result = {
+            "size": size,
+            "build_s": round(build_s, 3),
+            "disk_bytes": disk_bytes(path),
+            "load_s": round(load_s, 4),
+            "rss_mb": round(rss_after, 1),
+            "load_rss_delta_mb": round(rss_after - rss_before, 1),
+            "embed_ms": embed_ms,
+            "search_ms": search_ms,
+        }
+    print(
+        f"size={size:<8} build={result['build_s']:8.2f}s disk={result['disk_bytes'] / 2**20:8.1f}MiB "
+        f"load={result['load_s']:7.3f}s rss={result['rss_mb']:8.1f}MiB "
+        + " ".join(f"p95@{k}={v['p95']:.3f}ms" for k, v in search_ms.items())
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 3, 10, 50])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--mmap", action="store_true", help="Memory-map the index when loading")
+    parser.add_argument("--random-vectors", action="store_true",
+                        help="Use deterministic random vectors instead of the embedding model")
+    parser.add_argument("--output", default="bench_retrieval_scaling.json")
+    args = parser.parse_args()
+
+    embeddings = RandomEmbeddings() if args.random_vectors else None
+    if embeddings is None:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from app.config import settings
+        embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+    queries = synthetic_queries(args.queries)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "faiss": faiss.__version__,
+            "random_vectors": args.random_vectors,
+            "shards": args.shards,
+            "mmap": args.mmap,
+            "queries": args.queries,
+        },
+        "results": [bench_size(size, embeddings, queries, args) for size in args.sizes],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
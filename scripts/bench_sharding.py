@@ -0,0 +1,70 @@
+# scripts/bench_sharding.py
+"""Search latency and rebuild time of the sharded vector store vs. shard count.
+
+Usage:
+    python -m scripts.bench_sharding --docs 50000 --shards 1 2 4 8
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from app.services.vector_store import VectorStoreService
+from scripts.bench_utils import (
+    RandomEmbeddings, percentiles, synthetic_documents, synthetic_queries, time_calls
+)
+
+
+def run(num_docs: int, shard_counts, num_queries: int, top_k: int, shard_key: str):
+    documents = synthetic_documents(num_docs)
+    queries = synthetic_queries(num_queries)
+    embeddings = RandomEmbeddings()
+    results = []
+
+    for num_shards in shard_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = VectorStoreService(
+                embeddings=embeddings,
+                index_path=f"{tmp}/vector_store.index",
+                num_shards=num_shards,
+                shard_key=shard_key
+            )
+            start = time.perf_counter()
+            store.index_documents(documents)
+            full_build_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.rebuild_shard(0, documents)
+            shard_rebuild_s = time.perf_counter() - start
+
+            store.search(queries[0], top_k=top_k)  # warm-up
+            latency = percentiles(time_calls(lambda q: store.search(q, top_k=top_k), queries))
+
+        results.append({
+            "shards": num_shards,
+            "full_build_s": round(full_build_s, 3),
+            "single_shard_rebuild_s": round(shard_rebuild_s, 3),
+            "search_ms": latency,
+        })
+        print(
+            f"shards={num_shards:<3} build={full_build_s:7.2f}s "
+            f"rebuild(shard 0)={shard_rebuild_s:7.2f}s "
+            f"search p50={latency['p50']:.3f}ms p95={latency['p95']:.3f}ms"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--shard-key", default="source")
+    parser.add_argument("--output", help="Optional JSON output file")
+    args = parser.parse_args()
+
+    results = run(args.docs, args.shards, args.queries, args.top_k, args.shard_key)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,90 @@
+# scripts/bench_utils.py
+"""Shared helpers for the benchmark harnesses in ``scripts/bench_*.py``.
+
+Run the harnesses as modules from the repository root, e.g.
+``python -m scripts.bench_sharding``.
+"""
+import random
+import time
+import zlib
+from typing import Callable, Dict, List
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_core.embeddings import Embeddings
+
+CATEGORIES = ["audio", "wearables", "phones", "laptops", "home", "cameras", "gaming", "accessories"]
+FEATURES = [
+    "bluetooth 5.3", "noise cancellation", "IP68 water resistance", "fast charging",
+    "2-year warranty", "OLED display", "GPS", "wifi 6", "USB-C", "voice assistant",
+    "heart rate monitoring", "30-hour battery", "4K recording", "touch controls",
+]
+
+
+class RandomEmbeddings(Embeddings):
+    """Deterministic pseudo-random embeddings to skip the embedding model cost.
+
+    The same text always maps to the same unit vector, so queries built from
+    document text still find their source document.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        vector = rng.standard_normal(self.dimension).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def synthetic_documents(count: int, seed: int = 0) -> List[Document]:
+    """Generate a synthetic product catalog of ``count`` chunks."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        features = ", ".join(rng.sample(FEATURES, 3))
+        docs.append(Document(
+            page_content=(
+                f"Product: {category.title()} Model {i:07d}\n"
+                f"The model {i:07d} is a {category} product with {features}."
+            ),
+            metadata={"source": f"product_{i:07d}.txt", "category": category}
+        ))
+    return docs
+
+
+def synthetic_queries(count: int, seed: int = 1) -> List[str]:
+    """Generate product-style questions."""
+    rng = random.Random(seed)
+    return [
+        f"which {rng.choice(CATEGORIES)} products have {rng.choice(FEATURES)}?"
+        for _ in range(count)
+    ]
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (milliseconds)."""
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+    }
+
+
+def time_calls(fn: Callable, args_list: List) -> List[float]:
+    """Call ``fn`` once per argument and return per-call latency in ms."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
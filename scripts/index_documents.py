@@ -1,12 +1,17 @@
 # scripts/index_documents.py
+import argparse
 import os
+import tempfile
+import time
 from langchain.docstore.document import Document
+from app.config import settings
+from app.services.dedup import NearDuplicateDetector
 from app.services.vector_store import VectorStoreService
 
-def load_documents():
+def load_documents(docs_dir="data/product_docs"):
     docs = []
-    for filename in os.listdir("data/product_docs"):
-        with open(f"data/product_docs/{filename}", "r", encoding='utf-8') as f:
+    for filename in os.listdir(docs_dir):
+        with open(os.path.join(docs_dir, filename), "r", encoding='utf-8') as f:
             content = f.read()
         docs.append(Document(
             page_content=content,
@@ -14,8 +19,92 @@ def load_documents():
         ))
     return docs
 
+def retrieval_report(vector_store, documents, detector, top_k):
+    """Compare retrieval on the full and the deduplicated corpus.
+
+    Every distinct document is used as a query (its first line). For each
+    result list we count hits that repeat a near-duplicate cluster already
+    returned, and the characters of context that would be sent to the LLM.
+    """
+    cluster_of = dict(zip(
+        (doc.metadata["source"] for doc in documents),
+        detector.find_clusters([doc.page_content for doc in documents])
+    ))
+    with tempfile.TemporaryDirectory() as tmp:
+        full_store = VectorStoreService(
+            embeddings=vector_store.embeddings,
+            index_path=os.path.join(tmp, "full.index"),
+            num_shards=vector_store.num_shards
+        )
+        full_store.index_documents(documents)
+        queries = list({cluster_of[d.metadata["source"]]: d.page_content.splitlines()[0] for d in documents}.values())
+
+        report = {}
+        for name, store in (("full", full_store), ("deduplicated", vector_store)):
+            redundant = context_chars = 0
+            for query in queries:
+                results = store.search(query, top_k=top_k)
+                clusters = [cluster_of[doc.metadata["source"]] for doc in results]
+                redundant += len(clusters) - len(set(clusters))
+                context_chars += sum(len(doc.page_content) for doc in results)
+            report[name] = {
+                "redundant_hits_per_query": round(redundant / len(queries), 3),
+                "context_chars_per_query": round(context_chars / len(queries), 1),
+            }
+    return report
+
 if __name__ == "__main__":
-    vector_store = VectorStoreService()
-    documents = load_documents()
-    vector_store.index_documents(documents)
-    print(f"Indexados {len(documents)} documentos. Índice guardado en {vector_store.index_path}")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Index product documents into the vector store")
+    parser.add_argument("--docs-dir", default="data/product_docs", help="Folder with the .txt product documents")
+    parser.add_argument("--catalog", help="Index into data/catalogs/<catalog>/ instead of the default catalog")
+    parser.add_argument("--no-dedup", action="store_true", help="Index every chunk, skipping near-duplicate collapsing")
+    parser.add_argument("--dedup-threshold", type=float, default=settings.DEDUP_THRESHOLD,
+                        help="Estimated Jaccard similarity above which chunks are merged")
+    parser.add_argument("--reduction", choices=["none", "pca", "truncate"], default=settings.INDEX_REDUCTION,
+                        help="Reduce vector dimensionality by PCA or Matryoshka-style truncation")
+    parser.add_argument("--reduced-dim", type=int, default=settings.INDEX_REDUCED_DIM,
+                        help="Dimensions kept by --reduction")
+    parser.add_argument("--quantization", choices=["none", "fp16", "int8"], default=settings.INDEX_QUANTIZATION,
+                        help="Store vectors as fp16 or int8 scalar codes")
+    parser.add_argument("--report", action="store_true",
+                        help="Also compare deduplicated retrieval against an index of the full corpus")
+    args = parser.parse_args()
+    if args.report and args.no_dedup:
+        parser.error("--report compares against deduplication and cannot be combined with --no-dedup")
+
+    index_path = (
+        os.path.join(settings.CATALOGS_DIR, args.catalog, "vector_store.index") if args.catalog else None
+    )
+    vector_store = VectorStoreService(
+        index_path=index_path,
+        reduction=args.reduction,
+        reduced_dim=args.reduced_dim,
+        quantization=args.quantization
+    )
+    documents = load_documents(args.docs_dir)
+    indexed = documents
+    start = time.perf_counter()
+
+    if not args.no_dedup:
+        detector = NearDuplicateDetector(threshold=args.dedup_threshold, num_perm=settings.DEDUP_NUM_PERM)
+        indexed, stats = detector.collapse(documents)
+        print(
+            f"Near-duplicates: {stats['input']} -> {stats['output']} chunks "
+            f"(reduction {stats['reduction_ratio']:.1%}, {stats['elapsed_s']:.3f}s)"
+        )
+
+    index_start = time.perf_counter()
+    vector_store.index_documents(indexed)
+    index_s = time.perf_counter() - index_start
+    print(f"Indexados {len(indexed)} documentos. Índice guardado en {vector_store.index_path}")
+    if args.reduction != "none" or args.quantization != "none":
+        print(f"Vector storage: {vector_store.estimated_bytes() / 2**20:.1f} MiB estimated in memory")
+
+    if not args.no_dedup:
+        print(
+            f"Ingest time {time.perf_counter() - start:.3f}s, dedup overhead "
+            f"{stats['elapsed_s'] / max(index_s, 1e-9):.1%} of indexing time"
+        )
+        if args.report:
+            for name, values in retrieval_report(vector_store, documents, detector, settings.TOP_K).items():
+                print(f"Retrieval ({name}): {values}")
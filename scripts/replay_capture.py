@@ -0,0 +1,91 @@
+# scripts/replay_capture.py
+"""Replay captured /query traffic against a running API.
+
+Reads the capture files written by the API (``CAPTURE_DIR``, plain or
+gzipped JSONL, oldest first) and sends every request again. With
+``--speed 1`` the original inter-arrival times are kept, ``--speed 2``
+replays twice as fast and ``--speed 0`` sends as fast as ``--concurrency``
+allows. Latency percentiles, status codes and the share of responses whose
+hash matches the captured one are reported.
+
+Usage:
+    python -m scripts.replay_capture --url http://localhost:8000 --speed 1
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+from app.config import settings
+from app.services.capture import capture_files, read_capture, response_hash
+from scripts.bench_utils import percentiles
+
+# Request fields sent back to POST /query; everything else in a record is metadata
+REQUEST_FIELDS = ("user_id", "query", "catalog_id", "timeout_ms", "priority")
+
+
+async def replay(records: List[Dict], client: httpx.AsyncClient, speed: float = 1.0, concurrency: int = 16) -> Dict:
+    """Send the captured requests and compare the answers with the capture."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses, matches = [], Counter(), [0, 0]
+    start = time.perf_counter()
+    first_ts = records[0]["ts"] if records else 0.0
+
+    async def send(record: Dict):
+        if speed > 0:
+            await asyncio.sleep(max(0.0, (record["ts"] - first_ts) / speed - (time.perf_counter() - start)))
+        body = {field: record[field] for field in REQUEST_FIELDS if record.get(field) is not None}
+        async with semaphore:
+            sent = time.perf_counter()
+            try:
+                response = await client.post("/query", json=body)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                return
+            latencies.append((time.perf_counter() - sent) * 1000)
+        statuses[str(response.status_code)] += 1
+        if response.status_code == 200 and record.get("response_hash"):
+            matches[1] += 1
+            matches[0] += response_hash(response.json()["response"]) == record["response_hash"]
+
+    await asyncio.gather(*(send(record) for record in records))
+    return {
+        "requests": len(records),
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "statuses": dict(statuses),
+        "latency_ms": percentiles(latencies) if latencies else None,
+        "response_match_rate": round(matches[0] / matches[1], 4) if matches[1] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--capture-dir", default=settings.CAPTURE_DIR)
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression factor (0 = no pacing)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--timeout-s", type=float, default=60)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    records = list(read_capture(capture_files(args.capture_dir)))[:args.limit]
+    print(f"Replaying {len(records)} requests against {args.url}")
+
+    async def run():
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout_s) as client:
+            return await replay(records, client, args.speed, args.concurrency)
+
+    result = asyncio.run(run())
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# test/test_benchmarks.py
+import argparse
+import asyncio
+import pytest
+from scripts import bench_llm_scheduler
+from scripts import bench_compression
+from scripts.bench_mmr import bench_select
+from scripts.bench_retrieval_scaling import bench_size
+from scripts.bench_utils import RandomEmbeddings, synthetic_queries
+
+# ----- Performance Tests -----
+@pytest.mark.performance
+def test_retrieval_scaling_smoke():
+    """The scaling suite runs end to end on a small synthetic catalog"""
+    args = argparse.Namespace(shards=2, mmap=True, top_k=[1, 10])
+
+    result = bench_size(1000, RandomEmbeddings(dimension=64), synthetic_queries(20), args)
+
+    assert result["size"] == 1000
+    assert result["disk_bytes"] > 1000 * 64 * 4
+    assert set(result["search_ms"]) == {"1", "10"}
+    for k, stats in result["search_ms"].items():
+        assert stats["p95"] < 50, f"top-{k} search on 1k vectors should stay well under 50ms"
+
+@pytest.mark.performance
+def test_interactive_latency_flat_during_batch_flood():
+    """A batch flood barely moves interactive p95 once priorities are on"""
+    args = argparse.Namespace(
+        concurrency=4, batch_concurrency=3, llm_ms=20, rate=40, flood=500, duration_s=1.5
+    )
+
+    prioritized = asyncio.run(bench_llm_scheduler.run(args, prioritized=True))
+    fifo = asyncio.run(bench_llm_scheduler.run(args, prioritized=False))
+
+    wait = prioritized["queue_wait_ms"]
+    assert wait["interactive"]["p95"] < wait["batch"]["p95"]
+    assert prioritized["interactive_ms"]["during"]["p95"] < 3 * prioritized["interactive_ms"]["before"]["p95"]
+    assert fifo["interactive_ms"]["during"]["p95"] > 5 * prioritized["interactive_ms"]["during"]["p95"]
+
+@pytest.mark.performance
+def test_mmr_select_cost():
+    """MMR over a pool of ~100 candidates adds well under a millisecond"""
+    result = bench_select(100, 384, 3)
+
+    assert result["mmr_select_ms"]["p50"] < 1, "MMR on 100 candidates should take a fraction of a ms"
+
+@pytest.mark.performance
+def test_compression_report():
+    """Quantized storage shrinks vectors as expected and fp16 keeps recall"""
+    args = argparse.Namespace(docs=2000, queries=20, reduced_dim=16, top_k=[10])
+
+    results = {
+        (r["reduction"], r["quantization"]): r
+        for r in bench_compression.run(args, RandomEmbeddings(dimension=64))
+    }
+
+    assert results[("none", "fp16")]["compression_ratio"] == 2
+    assert results[("none", "int8")]["compression_ratio"] == 4
+    assert results[("pca", "int8")]["compression_ratio"] == 16
+    assert results[("none", "fp16")]["recall"]["10"] > 0.95
@@ -0,0 +1,88 @@
+# test/test_capture.py
+import asyncio
+import json
+import httpx
+import pytest
+from app.services.capture import CaptureLog, capture_files, read_capture, response_hash
+from scripts.replay_capture import replay
+
+@pytest.mark.asyncio
+async def test_records_are_flushed_in_batches(tmp_path):
+    capture = CaptureLog(str(tmp_path), batch_size=100, flush_interval_s=0.05)
+    await capture.start()
+    for i in range(250):
+        assert capture.record(query=f"q{i}", user_id="usr_1", sources=["a.txt"], response_hash="abc")
+    await capture.stop()
+
+    records = list(read_capture(capture.files()))
+    assert [r["query"] for r in records] == [f"q{i}" for i in range(250)]
+    assert records[0]["sources"] == ["a.txt"] and "ts" in records[0]
+    assert capture.stats()["written"] == 250
+
+@pytest.mark.asyncio
+async def test_record_keeps_the_arrival_time(tmp_path):
+    capture = CaptureLog(str(tmp_path))
+    capture.record(ts=1000.0, query="slow one")
+    await capture.stop()
+
+    assert [r["ts"] for r in read_capture(capture.files())] == [1000.0]
+
+def test_restarts_on_a_new_event_loop(tmp_path):
+    """A second lifespan runs on a new loop; the capture must keep working"""
+    capture = CaptureLog(str(tmp_path), flush_interval_s=0.01)
+
+    async def serve(query):
+        await capture.start()
+        capture.record(query=query)
+        await asyncio.sleep(0.1)
+        await capture.stop()
+
+    asyncio.run(serve("first"))
+    asyncio.run(serve("second"))
+
+    assert [r["query"] for r in read_capture(capture.files())] == ["first", "second"]
+    assert capture.stats()["write_errors"] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking(tmp_path):
+    capture = CaptureLog(str(tmp_path), max_queue=10)
+
+    accepted = [capture.record(query=f"q{i}") for i in range(25)]
+
+    assert accepted.count(True) == 10
+    assert capture.stats()["dropped"] == 15
+    await capture.stop()
+    assert capture.stats()["written"] == 10
+
+@pytest.mark.asyncio
+async def test_rotation_compresses_and_keeps_order(tmp_path):
+    capture = CaptureLog(str(tmp_path), batch_size=10, max_file_bytes=500, compress=True)
+    for i in range(60):
+        capture.record(query=f"question number {i}", user_id="usr_1")
+    await capture.stop()
+
+    files = capture_files(str(tmp_path))
+    assert capture.rotations >= 2
+    assert all(path.endswith(".jsonl.gz") for path in files[:-1])
+    assert [r["query"] for r in read_capture(files)] == [f"question number {i}" for i in range(60)]
+
+@pytest.mark.asyncio
+async def test_replay_sends_captured_requests():
+    records = [
+        {"ts": 100.0 + i * 0.01, "query": f"q{i}", "user_id": "usr_1", "catalog_id": None,
+         "priority": "batch", "response_hash": response_hash(f"answer q{i}")}
+        for i in range(5)
+    ]
+    bodies = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        bodies.append(body)
+        return httpx.Response(200, json={"response": f"answer {body['query']}"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+        result = await replay(records, client, speed=10)
+
+    assert result["statuses"] == {"200": 5}
+    assert result["response_match_rate"] == 1.0
+    assert bodies[0] == {"query": "q0", "user_id": "usr_1", "priority": "batch"}
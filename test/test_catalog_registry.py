@@ -0,0 +1,112 @@
+# test/test_catalog_registry.py
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from langchain.docstore.document import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.services.catalog_registry import CatalogRegistry, CatalogNotFound
+from app.services.vector_store import VectorStoreService
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=16)
+
+# ----- Fixtures -----
+@pytest.fixture
+def catalogs_dir(tmp_path):
+    """Three partner catalogs indexed on disk"""
+    for catalog_id in ("acme", "globex", "initech"):
+        store = VectorStoreService(
+            embeddings=EMBEDDINGS,
+            index_path=str(tmp_path / catalog_id / "vector_store.index"),
+            num_shards=1
+        )
+        store.index_documents([
+            Document(page_content=f"{catalog_id} product {i}", metadata={"source": f"{catalog_id}_{i}.txt"})
+            for i in range(20)
+        ])
+    return tmp_path
+
+def make_registry(catalogs_dir, budget_bytes=10**9, factory=None):
+    return CatalogRegistry(
+        default_store=MagicMock(spec=VectorStoreService),
+        store_factory=factory or (lambda path: VectorStoreService(
+            embeddings=EMBEDDINGS, index_path=path, num_shards=1, mmap=True
+        )),
+        catalogs_dir=str(catalogs_dir),
+        memory_budget_bytes=budget_bytes
+    )
+
+# ----- Unit Tests -----
+def test_default_catalog_is_the_default_store(catalogs_dir):
+    registry = make_registry(catalogs_dir)
+    assert registry.get(None) is registry.default_store
+    assert registry.get("default") is registry.default_store
+
+def test_catalog_is_loaded_lazily_once(catalogs_dir):
+    registry = make_registry(catalogs_dir)
+    store = registry.get("acme")
+
+    assert registry.get("acme") is store
+    assert store.search("acme product 3", top_k=1)[0].metadata["source"].startswith("acme_")
+    assert registry.stats()["catalogs"]["acme"]["loads"] == 1
+
+def test_unknown_or_invalid_catalog(catalogs_dir):
+    registry = make_registry(catalogs_dir)
+    with pytest.raises(CatalogNotFound):
+        registry.get("missing")
+    with pytest.raises(CatalogNotFound):
+        registry.get("../etc")
+
+def test_unknown_catalogs_leave_no_state_behind(catalogs_dir):
+    registry = make_registry(catalogs_dir)
+    for i in range(100):
+        with pytest.raises(CatalogNotFound):
+            registry.get(f"missing{i}")
+    registry.get("acme")
+
+    assert registry._load_locks == {}
+
+def test_concurrent_first_requests_load_once(catalogs_dir):
+    calls = []
+
+    def slow_factory(path):
+        calls.append(path)
+        time.sleep(0.1)
+        return VectorStoreService(embeddings=EMBEDDINGS, index_path=path, num_shards=1)
+
+    registry = make_registry(catalogs_dir, factory=slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("globex"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(store is results[0] for store in results)
+
+def test_least_recently_used_catalog_is_evicted(catalogs_dir):
+    registry = make_registry(catalogs_dir)
+    size = registry.get("acme").estimated_bytes()
+    registry.memory_budget_bytes = int(size * 2.5)
+
+    registry.get("globex")
+    registry.get("acme")  # globex becomes the coldest
+    registry.get("initech")
+
+    stats = registry.stats()
+    assert stats["catalogs"]["globex"]["evictions"] == 1
+    assert not stats["catalogs"]["globex"]["loaded"]
+    assert stats["catalogs"]["acme"]["loaded"]
+    assert stats["memory_used_bytes"] <= registry.memory_budget_bytes
+
+def test_latency_is_tracked_per_catalog(catalogs_dir):
+    registry = make_registry(catalogs_dir)
+    for latency in (1.0, 2.0, 3.0):
+        registry.record_latency("acme", latency)
+    registry.record_latency(None, 5.0)
+
+    stats = registry.stats()["catalogs"]
+    assert stats["acme"]["requests"] == 3
+    assert stats["acme"]["latency_ms"]["p50"] == 2.0
+    assert stats["default"]["requests"] == 1
@@ -0,0 +1,58 @@
+# test/test_dedup.py
+import pytest
+from langchain.docstore.document import Document
+from app.services.dedup import NearDuplicateDetector
+
+SPEC = (
+    "The ActivePro X3 is an IP68-certified waterproof smartwatch. It includes heart rate "
+    "monitoring, sleep tracking, and built-in GPS. Its battery lasts up to 7 days with "
+    "moderate use and it ships with a magnetic charger and a two-year warranty."
+)
+
+@pytest.fixture
+def detector():
+    return NearDuplicateDetector(threshold=0.8)
+
+@pytest.fixture
+def documents():
+    return [
+        Document(page_content=SPEC, metadata={"source": "x3_black.txt"}),
+        Document(page_content=SPEC.replace("magnetic charger", "magnetic charger in blue"), metadata={"source": "x3_blue.txt"}),
+        Document(page_content="SoundMax headphones with active noise cancellation and 30-hour battery life.",
+                 metadata={"source": "soundmax.txt"}),
+        Document(page_content=SPEC, metadata={"source": "x3_eu.txt"}),
+    ]
+
+def test_signature_is_deterministic(detector):
+    assert (detector.signature(SPEC) == detector.signature(SPEC)).all()
+    assert len(detector.signature(SPEC)) == 128
+
+def test_find_clusters_groups_near_duplicates(detector, documents):
+    clusters = detector.find_clusters([doc.page_content for doc in documents])
+    assert clusters == [0, 0, 2, 0]
+
+def test_collapse_keeps_all_source_names(detector, documents):
+    collapsed, stats = detector.collapse(documents)
+
+    assert len(collapsed) == 2
+    merged = next(doc for doc in collapsed if "sources" in doc.metadata)
+    assert merged.metadata["sources"] == ["x3_black.txt", "x3_blue.txt", "x3_eu.txt"]
+    assert merged.metadata["duplicates"] == 2
+    assert "in blue" in merged.page_content  # longest variant is kept
+    assert stats["input"] == 4
+    assert stats["output"] == 2
+    assert stats["reduction_ratio"] == 0.5
+
+def test_distinct_documents_are_untouched(detector):
+    docs = [
+        Document(page_content="Compact espresso machine with milk frother.", metadata={"source": "a.txt"}),
+        Document(page_content="Gaming laptop with 16GB RAM and RTX graphics.", metadata={"source": "b.txt"}),
+    ]
+    collapsed, stats = detector.collapse(docs)
+    assert collapsed == docs
+    assert stats["reduction_ratio"] == 0.0
+
+def test_band_split_matches_threshold():
+    detector = NearDuplicateDetector(threshold=0.85, num_perm=128)
+    assert detector.bands * detector.rows == 128
+    assert (1 / detector.bands) ** (1 / detector.rows) <= 0.85
@@ -0,0 +1,269 @@
+# test/test_ingestion.py
+import json
+import threading
+import time
+import pytest
+from langchain.docstore.document import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.services.ingestion import IngestionService, WriteAheadLog
+from app.services.vector_store import VectorStoreService
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=16)
+
+# ----- Fixtures -----
+@pytest.fixture
+def vector_store(tmp_path):
+    store = VectorStoreService(embeddings=EMBEDDINGS, index_path=str(tmp_path / "index"), num_shards=2)
+    store.index_documents([
+        Document(page_content=f"product {i}", metadata={"source": f"p{i}.txt"}) for i in range(10)
+    ])
+    return store
+
+@pytest.fixture
+def wal(tmp_path):
+    return WriteAheadLog(str(tmp_path / "ingest.wal"))
+
+def sources(store):
+    return {
+        doc.metadata["source"]
+        for db in store.shards if db is not None
+        for doc in db.docstore._dict.values()
+    }
+
+def wait_for(service, seq, timeout=5):
+    deadline = time.monotonic() + timeout
+    while service.applied_seq < seq and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.applied_seq >= seq
+
+# ----- Unit Tests -----
+class TestWriteAheadLog:
+    def test_append_assigns_increasing_sequence_numbers(self, wal):
+        assert wal.append({"op": "delete", "source": "a"}) == 1
+        assert wal.append({"op": "delete", "source": "b"}) == 2
+        assert [e["source"] for e in wal.read_all()] == ["a", "b"]
+
+    def test_sequence_survives_restart(self, wal):
+        wal.append({"op": "delete", "source": "a"})
+        assert WriteAheadLog(wal.path).append({"op": "delete", "source": "b"}) == 2
+
+    def test_truncate_keeps_later_entries(self, wal):
+        for source in "abc":
+            wal.append({"op": "delete", "source": source})
+        wal.truncate_through(2)
+        assert [e["seq"] for e in wal.read_all()] == [3]
+
+    def test_torn_last_line_is_ignored(self, wal):
+        wal.append({"op": "delete", "source": "a"})
+        with open(wal.path, "a", encoding="utf-8") as f:
+            f.write('{"seq": 2, "op": "del')
+        assert len(wal.read_all()) == 1
+
+    def test_appends_after_torn_line_are_replayed(self, wal):
+        wal.append({"op": "delete", "source": "a"})
+        with open(wal.path, "a", encoding="utf-8") as f:
+            f.write('{"seq": 2, "op": "del')
+
+        reopened = WriteAheadLog(wal.path)
+        assert reopened.append({"op": "delete", "source": "b"}) == 2
+        assert reopened.append({"op": "delete", "source": "c"}) == 3
+        assert [e["source"] for e in WriteAheadLog(wal.path).read_all()] == ["a", "b", "c"]
+
+    def test_malformed_line_does_not_hide_later_entries(self, wal):
+        wal.append({"op": "delete", "source": "a"})
+        with open(wal.path, "a", encoding="utf-8") as f:
+            f.write("not json\n")
+        wal.append({"op": "delete", "source": "b"})
+        assert [e["source"] for e in wal.read_all()] == ["a", "b"]
+
+class TestApplyChanges:
+    def test_upsert_replaces_and_delete_removes(self, vector_store):
+        vector_store.apply_changes(
+            upserts=[(Document(page_content="new text", metadata={"source": "p1.txt"}), EMBEDDINGS.embed_query("new text"))],
+            deletes=["p2.txt"]
+        )
+        assert "p2.txt" not in sources(vector_store)
+        contents = [
+            doc.page_content for db in vector_store.shards if db is not None
+            for doc in db.docstore._dict.values() if doc.metadata["source"] == "p1.txt"
+        ]
+        assert contents == ["new text"]
+
+    def test_live_shards_are_never_mutated(self, vector_store):
+        """Searches holding the old shard keep a consistent snapshot"""
+        before = list(vector_store.shards)
+        sizes = [db.index.ntotal for db in before]
+
+        vector_store.apply_changes(deletes=[f"p{i}.txt" for i in range(10)])
+
+        assert [db.index.ntotal for db in before] == sizes
+        assert vector_store.shards == [None, None]
+
+    def test_collapsed_chunk_drops_only_removed_sources(self, vector_store):
+        cluster = Document(
+            page_content="shared spec sheet",
+            metadata={"source": "a.txt", "sources": ["a.txt", "b.txt", "c.txt"], "duplicates": 2}
+        )
+        vector_store.apply_changes(upserts=[(cluster, EMBEDDINGS.embed_query(cluster.page_content))])
+
+        def cluster_metadata():
+            return [
+                doc.metadata for db in vector_store.shards if db is not None
+                for doc in db.docstore._dict.values() if doc.page_content == "shared spec sheet"
+            ]
+
+        vector_store.apply_changes(deletes=["b.txt"])
+        assert cluster_metadata() == [
+            {"source": "a.txt", "sources": ["a.txt", "c.txt"], "duplicates": 1}
+        ]
+
+        # Removing the keeper re-elects a remaining source instead of dropping the content
+        vector_store.apply_changes(deletes=["a.txt"])
+        assert cluster_metadata() == [{"source": "c.txt"}]
+
+        vector_store.apply_changes(deletes=["c.txt"])
+        assert cluster_metadata() == []
+
+    def test_search_racing_a_swap_does_not_cache_stale_results(self, vector_store):
+        gather = vector_store._gather
+
+        def gather_then_delete(*args):
+            hits = gather(*args)
+            vector_store.apply_changes(deletes=["p4.txt"])
+            return hits
+
+        vector_store._gather = gather_then_delete
+        stale = vector_store.search("product 4", top_k=10)
+        vector_store._gather = gather
+
+        assert "p4.txt" in {doc.metadata["source"] for doc in stale}
+        assert "p4.txt" not in {doc.metadata["source"] for doc in vector_store.search("product 4", top_k=10)}
+
+class TestIngestionService:
+    def test_changes_are_applied_in_background(self, vector_store, wal):
+        service = IngestionService(vector_store, wal, batch_wait_s=0.01)
+        service.start()
+        service.submit_upsert("new.txt", "brand new blender", {"category": "home"})
+        seq = service.submit_delete("p3.txt")
+        wait_for(service, seq)
+        service.stop()
+
+        assert "new.txt" in sources(vector_store)
+        assert "p3.txt" not in sources(vector_store)
+        assert vector_store.search("brand new blender", top_k=1)[0].metadata["category"] == "home"
+
+    def test_last_change_per_source_wins(self, vector_store, wal):
+        service = IngestionService(vector_store, wal, batch_wait_s=0.01)
+        service.submit_upsert("new.txt", "first")
+        service.submit_delete("new.txt")
+        seq = service.submit_upsert("new.txt", "second")
+        service.start()
+        wait_for(service, seq)
+        service.stop()
+
+        docs = vector_store.search("second", top_k=20)
+        assert [d.page_content for d in docs if d.metadata["source"] == "new.txt"] == ["second"]
+
+    def test_stop_snapshots_and_truncates_the_log(self, vector_store, wal):
+        service = IngestionService(vector_store, wal, batch_wait_s=0.01)
+        service.start()
+        seq = service.submit_upsert("new.txt", "persisted")
+        wait_for(service, seq)
+        service.stop()
+
+        assert wal.read_all() == []
+        reloaded = VectorStoreService(embeddings=EMBEDDINGS, index_path=vector_store.index_path, num_shards=2)
+        reloaded.load_index()
+        assert "new.txt" in sources(reloaded)
+
+    def test_unapplied_changes_are_replayed_on_start(self, vector_store, wal):
+        WriteAheadLog(wal.path).append({"op": "upsert", "source": "late.txt", "content": "late", "metadata": {}})
+        service = IngestionService(vector_store, WriteAheadLog(wal.path), batch_wait_s=0.01)
+        service.start()
+        wait_for(service, 1)
+        service.stop()
+
+        assert "late.txt" in sources(vector_store)
+
+    def test_failing_change_is_dead_lettered_and_log_compacts(self, vector_store, wal, monkeypatch):
+        class FailingEmbeddings(DeterministicFakeEmbedding):
+            def embed_documents(self, texts):
+                if "poison" in texts:
+                    raise RuntimeError("embedding failed")
+                return super().embed_documents(texts)
+
+        monkeypatch.setattr(vector_store, "embeddings", FailingEmbeddings(size=16))
+        service = IngestionService(vector_store, wal, batch_wait_s=0.05, max_retries=2, retry_backoff_s=0.001)
+        service.start()
+        service.submit_upsert("bad.txt", "poison")
+        seq = service.submit_upsert("good.txt", "fine")
+        wait_for(service, seq)
+        service.stop()
+
+        assert "good.txt" in sources(vector_store)
+        assert "bad.txt" not in sources(vector_store)
+        stats = service.stats()
+        assert stats["retries"] == 2
+        assert stats["dead_lettered"] == 1
+        assert stats["failed_seq"] is None
+        assert stats["snapshot_seq"] == seq
+        assert wal.read_all() == []
+        with open(service.dead_letter_path, encoding="utf-8") as f:
+            assert [json.loads(line)["source"] for line in f] == ["bad.txt"]
+
+    def test_newest_change_per_source_wins_regardless_of_queue_order(self, vector_store, wal):
+        service = IngestionService(vector_store, wal)
+        upsert = {"seq": 2, "op": "upsert", "source": "new.txt", "content": "kept", "metadata": {}}
+        delete = {"seq": 1, "op": "delete", "source": "new.txt"}
+
+        service._apply([upsert, delete])
+        assert "new.txt" in sources(vector_store)
+
+        # An older change arriving in a later batch does not undo a newer one
+        service._apply([delete])
+        assert "new.txt" in sources(vector_store)
+
+    def test_compaction_stops_below_the_oldest_unapplied_change(self, vector_store, wal):
+        service = IngestionService(vector_store, wal)
+        for source in ("a.txt", "b.txt", "c.txt"):
+            service.submit_delete(source)
+        first, second, third = (service._queue.get() for _ in range(3))
+
+        service._process([first, third])
+        assert service.applied_seq == 1
+        service.compact()
+        assert [e["seq"] for e in wal.read_all()] == [2, 3]
+
+        service._process([second])
+        assert service.applied_seq == 3
+
+    def test_stop_skips_snapshot_while_worker_is_busy(self, vector_store, wal, monkeypatch):
+        class SlowEmbeddings(DeterministicFakeEmbedding):
+            def embed_documents(self, texts):
+                time.sleep(0.3)
+                return super().embed_documents(texts)
+
+        monkeypatch.setattr(vector_store, "embeddings", SlowEmbeddings(size=16))
+        service = IngestionService(vector_store, wal, batch_wait_s=0.01)
+        service.start()
+        service.submit_upsert("slow.txt", "slow")
+        time.sleep(0.1)
+        service.stop(timeout=0.01)
+
+        assert service.compactions == 0
+        assert len(wal.read_all()) == 1
+        service._thread.join()
+
+    def test_concurrent_submits_are_queued_in_log_order(self, vector_store, wal):
+        service = IngestionService(vector_store, wal)
+        threads = [
+            threading.Thread(target=lambda t=t: [service.submit_delete(f"s{t}_{i}") for i in range(50)])
+            for t in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        queued = [service._queue.get_nowait()["seq"] for _ in range(400)]
+        assert queued == sorted(queued)
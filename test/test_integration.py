@@ -2,10 +2,12 @@
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 from langchain.docstore.document import Document
-from app.agents.orchestrator import Orchestrator, AgentState
+from app.agents.orchestrator import Orchestrator, AgentState, DeadlineExceeded, DirectExecutor
 from app.agents.retriever import RetrieverAgent
 from app.agents.responder import ResponderAgent
+import asyncio
 import os
+import time
 
 @pytest.fixture
 def mock_agents():
@@ -52,7 +54,28 @@ class TestIntegration:
             "response": "Test response",
             "sources": [{"source_name": "test.pdf"}]
         }
-        mock_workflow.ainvoke.assert_called_once_with({"query": "test query"})
+        mock_workflow.ainvoke.assert_called_once()
+        state = mock_workflow.ainvoke.call_args.args[0]
+        assert state["query"] == "test query"
+        assert state["deadline"] > time.monotonic()
+
+    @pytest.mark.asyncio
+    async def test_process_query_expands_collapsed_sources(self, orchestrator):
+        test_docs = [
+            Document(page_content="spec", metadata={"source": "x3_black.txt", "sources": ["x3_black.txt", "x3_blue.txt"]}),
+            Document(page_content="other", metadata={"source": "soundmax.txt"})
+        ]
+        mock_workflow = AsyncMock()
+        mock_workflow.ainvoke.return_value = {"query": "q", "documents": test_docs, "response": "ok"}
+        orchestrator.workflow = mock_workflow
+
+        result = await orchestrator.process_query("q")
+
+        assert result["sources"] == [
+            {"source_name": "x3_black.txt"},
+            {"source_name": "x3_blue.txt"},
+            {"source_name": "soundmax.txt"}
+        ]
 
     @pytest.mark.asyncio
     async def test_process_query_failure(self, orchestrator):
@@ -81,23 +104,130 @@ class TestIntegration:
         result = orchestrator._retrieve_documents(state)
 
         assert result == {"documents": test_docs}
-        orchestrator.retriever.retrieve.assert_called_once_with("test query")
+        orchestrator.retriever.retrieve.assert_called_once_with("test query", None)
 
-    def test_generate_response(self, orchestrator):
+    @pytest.mark.asyncio
+    async def test_generate_response(self, orchestrator):
 
         test_docs = [Document(page_content="doc1")]
-        orchestrator.responder.generate_response.return_value = "Test response"
+        orchestrator.responder.agenerate_response.return_value = "Test response"
 
         
         state = AgentState(query="test query", documents=test_docs, response="")
-        result = orchestrator._generate_response(state)
+        result = await orchestrator._generate_response(state)
 
         
         assert result == {"response": "Test response"}
-        orchestrator.responder.generate_response.assert_called_once_with(
-            "test query", test_docs
+        orchestrator.responder.agenerate_response.assert_called_once_with(
+            "test query", test_docs, user_id=None, priority="interactive"
         )
 
+    @pytest.mark.asyncio
+    async def test_generate_response_cancels_llm_at_deadline(self, orchestrator):
+        test_docs = [Document(page_content="doc1", metadata={"source": "doc1.txt"})]
+        cancelled = asyncio.Event()
+
+        async def slow_llm(query, docs, **kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        orchestrator.responder.agenerate_response.side_effect = slow_llm
+        orchestrator.responder.degraded_response.return_value = "Fallback"
+
+        state = AgentState(query="test query", documents=test_docs, deadline=time.monotonic() + 0.05)
+        result = await orchestrator._generate_response(state)
+
+        assert result == {"response": "Fallback", "degraded": True, "documents": test_docs}
+        assert cancelled.is_set()
+        orchestrator.responder.degraded_response.assert_called_once_with("test query", test_docs)
+
+    def test_retrieve_documents_routes_catalog(self, orchestrator):
+        orchestrator.retriever.retrieve.return_value = []
+
+        state = AgentState(query="test query", catalog_id="partner_a")
+        orchestrator._retrieve_documents(state)
+
+        orchestrator.retriever.retrieve.assert_called_once_with("test query", "partner_a")
+
+    def test_retrieve_documents_without_budget(self, orchestrator):
+        state = AgentState(query="test query", deadline=time.monotonic() - 1)
+
+        with pytest.raises(DeadlineExceeded):
+            orchestrator._retrieve_documents(state)
+        orchestrator.retriever.retrieve.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_process_query_returns_degraded_answer_on_timeout(self, orchestrator):
+        def stuck_retrieval(query, catalog_id=None):
+            time.sleep(0.3)
+            return []
+
+        orchestrator.retriever.retrieve.side_effect = stuck_retrieval
+        orchestrator.responder.degraded_response.return_value = "Fallback"
+
+        result = await orchestrator.process_query("slow query", timeout_ms=50)
+
+        assert result == {"response": "Fallback", "sources": [], "degraded": True}
+
+    @pytest.mark.asyncio
+    async def test_process_query_propagates_degraded_flag(self, orchestrator):
+        """The fallback cites only the document it quotes"""
+        test_docs = [
+            Document(page_content="doc1", metadata={"source": "doc1.txt"}),
+            Document(page_content="doc2", metadata={"source": "doc2.txt"})
+        ]
+        orchestrator.retriever.retrieve.return_value = test_docs
+
+        async def slow_llm(query, docs, **kwargs):
+            await asyncio.sleep(5)
+
+        orchestrator.responder.agenerate_response.side_effect = slow_llm
+        orchestrator.responder.degraded_response.return_value = "Fallback"
+
+        result = await orchestrator.process_query("test query", timeout_ms=100)
+
+        assert result == {
+            "response": "Fallback",
+            "sources": [{"source_name": "doc1.txt"}],
+            "degraded": True
+        }
+
+    @pytest.mark.asyncio
+    async def test_direct_executor_matches_langgraph(self, mock_agents):
+        retriever, responder = mock_agents
+        retriever.retrieve.return_value = [
+            Document(page_content="doc1", metadata={"source": "doc1.txt"}),
+            Document(page_content="doc2", metadata={"source": "doc2.txt"})
+        ]
+        responder.agenerate_response.return_value = "Test response"
+
+        graph_result = await Orchestrator(retriever, responder, executor="langgraph").process_query("q", catalog_id="acme")
+        direct_result = await Orchestrator(retriever, responder, executor="direct").process_query("q", catalog_id="acme")
+
+        assert direct_result == graph_result
+        assert retriever.retrieve.call_args_list[0] == retriever.retrieve.call_args_list[1]
+
+    @pytest.mark.asyncio
+    async def test_direct_executor_merges_node_updates(self):
+        async def respond(state):
+            return {"response": f"{state['query']}:{len(state['documents'])}"}
+
+        executor = DirectExecutor([
+            ("retrieve", lambda state: {"documents": ["a", "b"]}),
+            ("respond", respond)
+        ])
+
+        result = await executor.ainvoke({"query": "q"})
+
+        assert result == {"query": "q", "documents": ["a", "b"], "response": "q:2"}
+
+    def test_unknown_executor(self, mock_agents):
+        with pytest.raises(ValueError, match="Unknown orchestrator executor"):
+            Orchestrator(*mock_agents, executor="celery")
+
     def test_workflow_structure(self, orchestrator):
   
         assert hasattr(orchestrator.workflow, 'nodes')
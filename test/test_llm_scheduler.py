@@ -0,0 +1,104 @@
+# test/test_llm_scheduler.py
+import asyncio
+import pytest
+from app.services.llm_scheduler import LLMScheduler
+
+
+async def _enqueue(scheduler, order, user_id, priority):
+    """Queue a call that records when it gets its slot and holds it briefly."""
+    async with scheduler.slot(user_id, priority):
+        order.append((user_id, priority))
+        await asyncio.sleep(0)
+
+
+async def _run_behind_blocker(scheduler, requests):
+    """Queue all requests while the only slot is busy, then let them drain in order."""
+    order = []
+    await scheduler.acquire("blocker")
+    tasks = [asyncio.create_task(_enqueue(scheduler, order, user, priority)) for user, priority in requests]
+    await asyncio.sleep(0)
+    scheduler.release("interactive")
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap():
+    scheduler = LLMScheduler(max_concurrency=2)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with scheduler.slot("usr", "interactive"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(10)))
+
+    assert peak == 2
+    assert scheduler.stats()["classes"]["interactive"]["granted"] == 10
+
+
+@pytest.mark.asyncio
+async def test_interactive_served_before_batch():
+    scheduler = LLMScheduler(max_concurrency=1, batch_max_concurrency=1)
+
+    order = await _run_behind_blocker(scheduler, [
+        ("bulk", "batch"), ("bulk", "batch"), ("chat", "interactive")
+    ])
+
+    assert order[0] == ("chat", "interactive")
+
+
+@pytest.mark.asyncio
+async def test_fair_queueing_across_users():
+    """A user with many queued requests does not delay a user with one"""
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    order = await _run_behind_blocker(scheduler, [("heavy", "batch")] * 5 + [("light", "batch")])
+
+    assert order.index(("light", "batch")) <= 1
+
+
+@pytest.mark.asyncio
+async def test_batch_cap_leaves_room_for_interactive():
+    scheduler = LLMScheduler(max_concurrency=3, batch_max_concurrency=2)
+    release = asyncio.Event()
+
+    async def batch_call():
+        async with scheduler.slot("bulk", "batch"):
+            await release.wait()
+
+    flood = [asyncio.create_task(batch_call()) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    # The third slot stays free for interactive traffic
+    await asyncio.wait_for(scheduler.acquire("chat", "interactive"), timeout=1)
+    scheduler.release("interactive")
+    assert scheduler.stats()["classes"]["batch"]["active"] == 2
+
+    release.set()
+    await asyncio.gather(*flood)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    scheduler = LLMScheduler(max_concurrency=1)
+    await scheduler.acquire("blocker")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(scheduler.acquire("usr"), timeout=0.01)
+    scheduler.release("interactive")
+
+    stats = scheduler.stats()
+    assert stats["active"] == 0
+    assert stats["classes"]["interactive"]["waiting"] == 0
+    assert stats["classes"]["interactive"]["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_priority():
+    with pytest.raises(ValueError, match="Unknown priority"):
+        await LLMScheduler().acquire("usr", "urgent")
@@ -0,0 +1,91 @@
+# test/test_memory.py
+import gc
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_core.outputs import Generation
+from app.services.cache import LRUCache
+from app.services.llm_service import LLMResponseCache
+from app.services.memory import MemoryManager, estimate_size
+
+def test_estimate_size_scales_with_content():
+    assert estimate_size([0.1] * 384) > 384 * 8
+    assert estimate_size(np.zeros(384, dtype=np.float32)) >= 384 * 4
+    small = Document(page_content="x", metadata={"source": "a.txt"})
+    large = Document(page_content="x" * 10000, metadata={"source": "a.txt"})
+    assert estimate_size(large) - estimate_size(small) >= 9999
+
+def test_caches_share_one_budget():
+    memory = MemoryManager(cache_budget_bytes=20_000)
+    first, second = LRUCache(1000, name="first"), LRUCache(1000, name="second")
+    memory.attach(first)
+    memory.attach(second)
+
+    for i in range(50):
+        first.put(f"a{i}", "x" * 500)
+        second.put(f"b{i}", "y" * 500)
+
+    assert memory.cache_bytes() <= 20_000
+    assert len(first) > 0 and len(second) > 0
+    assert memory.evictions == first.evictions + second.evictions > 0
+
+def test_cheap_entries_are_evicted_first():
+    """Entries that are cheap to recompute per byte go before expensive ones"""
+    memory = MemoryManager(cache_budget_bytes=10**9)
+    cheap, expensive = LRUCache(1000, name="cheap"), LRUCache(1000, name="expensive")
+    memory.attach(cheap)
+    memory.attach(expensive)
+    for i in range(10):
+        expensive.put(f"llm{i}", "z" * 1000, cost_ms=1000)
+        cheap.put(f"emb{i}", "z" * 1000, cost_ms=5)
+
+    memory.cache_budget_bytes = memory.cache_bytes() // 2
+    memory.enforce()
+
+    assert len(cheap) == 0
+    assert len(expensive) == 10
+
+def test_recently_used_entries_survive():
+    memory = MemoryManager(cache_budget_bytes=10**9)
+    cache = LRUCache(1000, name="search")
+    memory.attach(cache)
+    for i in range(10):
+        cache.put(i, "v" * 1000, cost_ms=10)
+    memory.cache_budget_bytes = cache.bytes - 1
+    memory.enforce()  # evicts one entry and advances the clock
+
+    cache.get(5)
+    memory.cache_budget_bytes = cache.bytes // 3
+    memory.enforce()
+
+    assert cache.get(5) is not None
+
+def test_report_breaks_down_components():
+    memory = MemoryManager(cache_budget_bytes=10**6)
+    cache = LRUCache(10, name="embeddings")
+    memory.attach(cache)
+    memory.register("vector_store", lambda: 1234)
+    memory.register("vector_store", lambda: 10**6, mapped=True)
+    cache.put("query", [0.1] * 32)
+
+    report = memory.report()
+
+    assert report["components"] == {"vector_store": 1234}
+    assert report["mapped"] == {"vector_store": 10**6}
+    assert report["caches"]["embeddings"]["entries"] == 1
+    assert report["accounted_bytes"] == 1234 + cache.bytes
+
+    del cache
+    gc.collect()
+    assert memory.report()["caches"] == {}
+
+def test_llm_response_cache_is_budgeted():
+    memory = MemoryManager(cache_budget_bytes=10**6)
+    llm_cache = LLMResponseCache(maxsize=10)
+    memory.attach(llm_cache.entries)
+
+    llm_cache.update("prompt", "model", [Generation(text="answer " * 100)])
+
+    assert llm_cache.lookup("prompt", "model")[0].text.startswith("answer")
+    assert memory.report()["caches"]["llm"]["bytes"] > 700
+    llm_cache.clear()
+    assert llm_cache.lookup("prompt", "model") is None
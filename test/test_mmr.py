@@ -0,0 +1,24 @@
+# test/test_mmr.py
+import numpy as np
+from app.services.mmr import mmr_select
+
+def test_lambda_one_ranks_by_relevance():
+    query = np.array([1.0, 0.0])
+    candidates = np.array([[0.5, 0.5], [1.0, 0.1], [0.0, 1.0], [1.0, 0.0]])
+
+    assert mmr_select(query, candidates, 4, lambda_mult=1.0) == [3, 1, 0, 2]
+
+def test_duplicates_are_skipped():
+    """A copy of the best match loses to a less relevant but different candidate"""
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([[1.0, 0.2, 0.0], [1.0, 0.2, 0.0], [0.9, -0.3, 0.3]])
+
+    assert mmr_select(query, candidates, 2, lambda_mult=0.5) == [0, 2]
+
+def test_selects_at_most_the_pool():
+    candidates = np.random.default_rng(0).standard_normal((3, 8))
+
+    selected = mmr_select(candidates[0], candidates, 10)
+
+    assert sorted(selected) == [0, 1, 2]
+    assert mmr_select(candidates[0], candidates[:0], 3) == []
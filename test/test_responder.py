@@ -1,14 +1,16 @@
 # app/tests/agents/test_responder.py
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from langchain.docstore.document import Document
 from app.agents.responder import ResponderAgent
 from app.services.llm_service import LLMService
+from app.services.llm_scheduler import LLMScheduler
 
 @pytest.fixture
 def mock_llm_service():
     service = MagicMock(spec=LLMService)
     service.get_llm.return_value = MagicMock()
+    service.scheduler = LLMScheduler(max_concurrency=2)
     return service
 
 @pytest.fixture
@@ -22,7 +24,8 @@ class TestResponderAgent:
         assert responder_agent.prompts == {
             "system": "template content",
             "no_context": "template content",
-            "error": "template content"
+            "error": "template content",
+            "degraded": "template content"
         }
 
     def test_generate_response_with_valid_input(self, responder_agent, mock_llm_service):
@@ -69,6 +72,58 @@ class TestResponderAgent:
             mock_logger.assert_called_once_with("Response generation failed: Test error")
             mock_chain.invoke.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_agenerate_response_with_valid_input(self, responder_agent):
+        mock_chain = MagicMock()
+        mock_chain.ainvoke = AsyncMock(return_value="Mocked response")
+        responder_agent.response_chain = mock_chain
+
+        response = await responder_agent.agenerate_response("Valid query", [
+            Document(page_content="content", metadata={"source": "doc1.pdf"})
+        ])
+
+        assert response == "Mocked response"
+        mock_chain.ainvoke.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_agenerate_response_releases_scheduler_slot(self, responder_agent, mock_llm_service):
+        mock_chain = MagicMock()
+        mock_chain.ainvoke = AsyncMock(side_effect=Exception("Test error"))
+        responder_agent.response_chain = mock_chain
+
+        response = await responder_agent.agenerate_response("Valid query", [
+            Document(page_content="content", metadata={})
+        ], user_id="usr_1", priority="batch")
+
+        assert response == "template content"
+        stats = mock_llm_service.scheduler.stats()
+        assert stats["active"] == 0
+        assert stats["classes"]["batch"]["granted"] == 1
+
+    def test_degraded_response_uses_top_snippet(self, responder_agent):
+        responder_agent.prompts["degraded"] = "{snippet} ({source})"
+        docs = [
+            Document(page_content="Top   match\ncontent", metadata={"source": "doc1.pdf"}),
+            Document(page_content="Second match", metadata={"source": "doc2.pdf"})
+        ]
+
+        response = responder_agent.degraded_response("Valid query", docs)
+
+        assert response == "Top match content (doc1.pdf)"
+
+    def test_degraded_response_truncates_long_snippets(self, responder_agent):
+        responder_agent.prompts["degraded"] = "{snippet}"
+        docs = [Document(page_content="word " * 500, metadata={})]
+
+        response = responder_agent.degraded_response("Valid query", docs)
+
+        assert len(response) <= 403
+        assert response.endswith("...")
+
+    def test_degraded_response_without_documents(self, responder_agent):
+        responder_agent.prompts["error"] = "error prompt"
+        assert responder_agent.degraded_response("Valid query", []) == "error prompt"
+
     def test_format_context_properly_structures_documents(self, responder_agent):
         test_docs = {
             "context": [
@@ -42,11 +42,46 @@ def test_retrieve_documents(retriever, mock_vector_store):
     assert len(results) == 2
     assert results[0].metadata["score"] >= results[1].metadata["score"]  # Verify reranking
 
+def test_direct_mode_matches_runnable_chain(mock_vector_store):
+    """The direct path returns exactly what the Runnable chain returns"""
+    chained = RetrieverAgent(vector_store=mock_vector_store).retrieve("Noise Cancelling")
+    direct = RetrieverAgent(vector_store=mock_vector_store, direct=True).retrieve("Noise Cancelling")
+
+    assert direct == chained
+    assert mock_vector_store.search.call_args_list[0] == mock_vector_store.search.call_args_list[1]
+
 def test_empty_query_handling(retriever):
     """Test proper error handling for empty queries"""
     with pytest.raises(ValueError, match="Query cannot be empty"):
         retriever.retrieve("   ")
 
+def test_catalog_routing(mock_vector_store):
+    """Queries with a catalog id are served by that catalog's store"""
+    catalog_store = MagicMock(spec=VectorStoreService)
+    catalog_store.search.return_value = []
+    catalogs = MagicMock()
+    catalogs.get.return_value = catalog_store
+    retriever = RetrieverAgent(vector_store=mock_vector_store, catalogs=catalogs)
+
+    retriever.retrieve("Headphones", catalog_id="acme")
+
+    catalogs.get.assert_called_once_with("acme")
+    catalog_store.search.assert_called_once_with("headphones")
+    mock_vector_store.search.assert_not_called()
+    assert catalogs.record_latency.call_args.args[0] == "acme"
+
+
+def test_mmr_stage_uses_mmr_search(mock_vector_store):
+    """With an MMR lambda the retriever asks the store for diversified results"""
+    mock_vector_store.search_mmr.return_value = []
+    retriever = RetrieverAgent(vector_store=mock_vector_store, mmr_lambda=0.7)
+
+    retriever.retrieve("Headphones")
+
+    mock_vector_store.search_mmr.assert_called_once_with("headphones", lambda_mult=0.7)
+    mock_vector_store.search.assert_not_called()
+
+
 # ----- Integration Tests -----
 @pytest.mark.integration
 def test_semantic_retrieval():
@@ -117,4 +152,4 @@ def test_retrieval_latency():
     elapsed = time.time() - start_time
     assert elapsed < 0.5, f"Retrieval took {elapsed:.2f}s (>500ms threshold)"
     
-    print(f"\nRetrieval latency: {elapsed*1000:.2f}ms for {len(results)} documents")
\ No newline at end of file
+    print(f"\nRetrieval latency: {elapsed*1000:.2f}ms for {len(results)} documents")
@@ -0,0 +1,69 @@
+# test/test_tracing.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from app.services.tracing import SlowRequestTracer, _current_trace, span
+
+def slow_request(tracer, delay_s=0.0):
+    with tracer.trace("POST /query", user_id="usr_1"):
+        with span("node.retrieve"):
+            with span("faiss.search", shard=0):
+                time.sleep(delay_s)
+        with span("llm"):
+            pass
+
+def slow_request_span():
+    with span("faiss.search"):
+        pass
+
+class TestSlowRequestTracer:
+    def test_keeps_only_slow_requests(self):
+        tracer = SlowRequestTracer(threshold_ms=20)
+        slow_request(tracer)
+        slow_request(tracer, delay_s=0.03)
+
+        traces = tracer.list()
+        assert len(traces) == 1
+        assert traces[0]["duration_ms"] >= 20
+        trace = tracer.get(traces[0]["trace_id"]).to_dict()
+        assert [s["name"] for s in trace["spans"]] == ["node.retrieve", "faiss.search", "llm"]
+        assert trace["spans"][1]["attributes"] == {"shard": 0}
+
+    def test_ring_buffer_is_bounded(self):
+        tracer = SlowRequestTracer(threshold_ms=0, buffer_size=3)
+        for _ in range(5):
+            slow_request(tracer)
+        assert len(tracer.list()) == 3
+
+    def test_unsampled_requests_record_nothing(self):
+        tracer = SlowRequestTracer(threshold_ms=0, sample_rate=0)
+        slow_request(tracer)
+        assert tracer.list() == []
+
+    def test_spans_outside_a_trace_are_ignored(self):
+        tracer = SlowRequestTracer(threshold_ms=0)
+        with span("orphan"):
+            assert _current_trace.get() is None
+
+        assert _current_trace.get() is None
+        assert tracer.list() == []
+        with tracer.trace("POST /query") as trace:
+            pass
+        assert trace.spans == []
+
+    def test_spans_from_worker_threads_join_the_trace(self):
+        tracer = SlowRequestTracer(threshold_ms=0)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with tracer.trace("POST /query") as trace:
+                pool.submit(contextvars.copy_context().run, slow_request_span).result()
+        assert [s.name for s in trace.spans] == ["faiss.search"]
+
+    def test_chrome_export_format(self):
+        tracer = SlowRequestTracer(threshold_ms=0)
+        slow_request(tracer)
+        exported = tracer.get(tracer.list()[0]["trace_id"]).to_chrome_trace()
+
+        events = exported["traceEvents"]
+        assert events[0]["name"] == "POST /query"
+        assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+        assert {e["name"] for e in events} == {"POST /query", "node.retrieve", "faiss.search", "llm"}
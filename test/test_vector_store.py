@@ -0,0 +1,249 @@
+# test/test_vector_store.py
+import os
+import zlib
+import numpy as np
+import pytest
+from langchain.docstore.document import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from app.services.vector_store import VectorStoreService
+
+# ----- Fixtures -----
+@pytest.fixture
+def documents():
+    """Small catalog spread over several sources and categories"""
+    return [
+        Document(
+            page_content=f"Product {i}: {category} device with feature {i}",
+            metadata={"source": f"product{i}.txt", "category": category}
+        )
+        for i, category in enumerate(["audio", "wearables", "phones", "audio", "home"] * 4)
+    ]
+
+@pytest.fixture
+def embeddings():
+    return DeterministicFakeEmbedding(size=32)
+
+def make_store(tmp_path, embeddings, num_shards, shard_key="source"):
+    return VectorStoreService(
+        embeddings=embeddings,
+        index_path=str(tmp_path / f"index_{num_shards}_{shard_key}"),
+        num_shards=num_shards,
+        shard_key=shard_key
+    )
+
+# ----- Unit Tests -----
+def test_partition_is_stable_and_complete(tmp_path, embeddings, documents):
+    """Every document lands in exactly one shard, always the same one"""
+    store = make_store(tmp_path, embeddings, 4)
+    partitions = store.partition(documents)
+
+    assert sum(len(p) for p in partitions) == len(documents)
+    for shard_id, shard_docs in enumerate(partitions):
+        assert all(store.shard_for(doc) == shard_id for doc in shard_docs)
+
+def test_category_sharding_groups_categories(tmp_path, embeddings, documents):
+    """Sharding by category keeps each category in a single shard"""
+    store = make_store(tmp_path, embeddings, 3, shard_key="category")
+    for category in {doc.metadata["category"] for doc in documents}:
+        shard_ids = {store.shard_for(doc) for doc in documents if doc.metadata["category"] == category}
+        assert len(shard_ids) == 1
+
+def test_sharded_search_matches_single_index(tmp_path, embeddings, documents):
+    """Scatter-gather returns the same global top-k as one big index"""
+    single = make_store(tmp_path, embeddings, 1)
+    sharded = make_store(tmp_path, embeddings, 4)
+    single.index_documents(documents)
+    sharded.index_documents(documents)
+
+    for query in ["audio device", "Product 7", "home feature"]:
+        expected = [doc.metadata["source"] for doc in single.search(query, top_k=5)]
+        actual = [doc.metadata["source"] for doc in sharded.search(query, top_k=5)]
+        assert actual == expected
+
+def test_rebuild_shard_leaves_other_shards_untouched(tmp_path, embeddings, documents):
+    """Rebuilding one shard only rewrites that shard on disk"""
+    store = make_store(tmp_path, embeddings, 3)
+    store.index_documents(documents)
+    mtimes = {
+        shard_id: os.path.getmtime(os.path.join(store.shard_path(shard_id), "index.faiss"))
+        for shard_id in range(3)
+    }
+    untouched = [store.shards[1], store.shards[2]]
+
+    store.rebuild_shard(0, documents + [Document(page_content="new", metadata={"source": "new.txt"})])
+
+    assert [store.shards[1], store.shards[2]] == untouched
+    for shard_id in (1, 2):
+        path = os.path.join(store.shard_path(shard_id), "index.faiss")
+        assert os.path.getmtime(path) == mtimes[shard_id]
+
+def test_load_index_restores_shards(tmp_path, embeddings, documents):
+    """A fresh service loads every shard written by a previous one"""
+    make_store(tmp_path, embeddings, 3).index_documents(documents)
+    reloaded = make_store(tmp_path, embeddings, 3)
+
+    results = reloaded.search("audio device", top_k=3)
+
+    assert len(results) == 3
+
+def test_mmap_vectors_are_not_counted_as_resident(tmp_path, embeddings, documents):
+    built = make_store(tmp_path, embeddings, 2)
+    built.index_documents(documents)
+    mapped = VectorStoreService(embeddings=embeddings, index_path=built.index_path, num_shards=2, mmap=True)
+    mapped.load_index()
+
+    vector_bytes = len(documents) * 32 * 4
+    assert built.mapped_bytes() == 0
+    assert mapped.mapped_bytes() == vector_bytes
+    assert mapped.estimated_bytes() == built.estimated_bytes() - vector_bytes
+
+    # A live update copies the shard into RAM, so it counts as resident again
+    mapped.apply_changes(deletes=["product0.txt"])
+    assert mapped.mapped_bytes() + mapped.estimated_bytes() < built.estimated_bytes()
+    assert mapped.mapped_bytes() < vector_bytes
+
+def test_search_without_index_raises(tmp_path, embeddings):
+    store = make_store(tmp_path, embeddings, 2)
+    with pytest.raises(ValueError, match="Vector store not initialized"):
+        store.search("anything")
+
+def test_search_results_are_cached_until_rebuild(tmp_path, embeddings, documents):
+    """Repeated queries hit the cache; rebuilding a shard invalidates it"""
+    store = make_store(tmp_path, embeddings, 2)
+    store.index_documents(documents)
+
+    store.search("audio device", top_k=3)
+    store.search("audio device", top_k=3)
+    assert store.search_cache.hits == 1
+
+    store.rebuild_shard(0, documents)
+    assert len(store.search_cache) == 0
+    store.search("audio device", top_k=3)
+    assert store.embedding_cache.hits == 1
+
+def test_mmr_search_diversifies_duplicates(tmp_path, embeddings, documents):
+    """MMR reuses the stored vectors and skips exact copies of the best hit"""
+    class BagOfWords(Embeddings):
+        def _embed(self, text):
+            vector = [0.0] * 64
+            for word in text.lower().split():
+                vector[zlib.crc32(word.encode()) % 64] += 1.0
+            return vector
+
+        def embed_documents(self, texts):
+            return [self._embed(text) for text in texts]
+
+        def embed_query(self, text):
+            return self._embed(text)
+
+    copies = [
+        Document(page_content="Noise cancelling headphones", metadata={"source": f"copy{i}.txt"})
+        for i in range(3)
+    ]
+    store = make_store(tmp_path, BagOfWords(), 2)
+    store.index_documents(documents + copies)
+
+    plain = store.search("noise cancelling headphones price", top_k=2)
+    diverse = store.search_mmr("noise cancelling headphones price", top_k=2, fetch_k=10, lambda_mult=0.5)
+
+    assert [doc.page_content for doc in plain] == ["Noise cancelling headphones"] * 2
+    assert diverse[0].page_content == "Noise cancelling headphones"
+    assert diverse[1].page_content != "Noise cancelling headphones"
+
+@pytest.mark.parametrize("reduction,quantization", [
+    ("none", "fp16"), ("none", "int8"), ("pca", "none"), ("pca", "int8"), ("truncate", "fp16")
+])
+def test_compressed_index_round_trip(tmp_path, embeddings, documents, reduction, quantization):
+    """Reduced/quantized shards shrink, find exact matches and survive save, mmap load and updates"""
+    plain = make_store(tmp_path, embeddings, 1)
+    plain.index_documents(documents)
+    store = VectorStoreService(
+        embeddings=embeddings, index_path=str(tmp_path / "compressed"), num_shards=2,
+        reduction=reduction, reduced_dim=8, quantization=quantization
+    )
+    store.index_documents(documents)
+
+    assert store.estimated_bytes() < plain.estimated_bytes()
+    assert store.search(documents[7].page_content, top_k=1)[0].metadata["source"] == "product7.txt"
+
+    loaded = VectorStoreService(
+        embeddings=embeddings, index_path=str(tmp_path / "compressed"), num_shards=2, mmap=True
+    )
+    loaded.load_index()
+    assert loaded.search("Product 3", top_k=5) == store.search("Product 3", top_k=5)
+
+    new_doc = Document(page_content="Brand new smart speaker", metadata={"source": "speaker.txt"})
+    loaded.apply_changes(upserts=[(new_doc, embeddings.embed_query(new_doc.page_content))])
+    assert loaded.search("Brand new smart speaker", top_k=1)[0].metadata["source"] == "speaker.txt"
+    assert len(loaded.search_mmr("Product 3", top_k=3, fetch_k=10)) == 3
+
+def test_mmap_load_without_in_place_flag(tmp_path, embeddings, documents, monkeypatch):
+    """FAISS builds without IO_FLAG_MMAP_IFC fall back to plain mmap"""
+    built = make_store(tmp_path, embeddings, 2)
+    built.index_documents(documents)
+    monkeypatch.delattr("faiss.IO_FLAG_MMAP_IFC")
+    mapped = VectorStoreService(embeddings=embeddings, index_path=built.index_path, num_shards=2, mmap=True)
+    mapped.load_index()
+
+    assert mapped.search("Product 3", top_k=5) == built.search("Product 3", top_k=5)
+
+def test_pca_falls_back_on_small_shards(tmp_path, embeddings, documents):
+    """An index with fewer vectors than PCA dimensions is stored unreduced"""
+    store = VectorStoreService(
+        embeddings=embeddings, index_path=str(tmp_path / "small"), num_shards=1,
+        reduction="pca", reduced_dim=30
+    )
+    store.index_documents(documents[:5])
+
+    assert store.shards[0].index.d == 32
+    assert store.search(documents[2].page_content, top_k=1)[0].metadata["source"] == "product2.txt"
+
+def test_pca_recall_across_shards(tmp_path):
+    """Shards share one PCA, so a shard created during ingestion still ranks fairly"""
+    rng = np.random.default_rng(0)
+    basis = rng.normal(size=(8, 64)) * 0.7
+    vectors = {}
+
+    class Lookup(Embeddings):
+        def embed_documents(self, texts):
+            return [vectors[text] for text in texts]
+
+        def embed_query(self, text):
+            return vectors[text]
+
+    def embed(text):
+        # Low-rank signal plus isotropic noise, the shape PCA is meant for
+        vectors[text] = (rng.normal(size=8) @ basis + rng.normal(size=64)).tolist()
+        return text
+
+    store = VectorStoreService(
+        embeddings=Lookup(), index_path=str(tmp_path / "pca"), num_shards=2,
+        reduction="pca", reduced_dim=16
+    )
+    candidates = [Document(page_content=embed(f"doc {i}"), metadata={"source": f"doc{i}.txt"}) for i in range(600)]
+    big = [d for d in candidates if store.shard_for(d) == 0][:200]
+    small = [d for d in candidates if store.shard_for(d) == 1][:10]
+    store.index_documents(big)
+    assert store.shards[1] is None
+    # Fewer vectors than PCA dimensions: the new shard must still join the trained space
+    store.apply_changes(upserts=[(d, vectors[d.page_content]) for d in small])
+
+    corpus = big + small
+    matrix = np.asarray([vectors[d.page_content] for d in corpus])
+    small_sources = {d.metadata["source"] for d in small}
+    recalled = exact_small = found_small = 0
+    for q in range(100):
+        query = embed(f"query {q}")
+        distances = ((matrix - np.asarray(vectors[query])) ** 2).sum(axis=1)
+        exact = {corpus[i].metadata["source"] for i in np.argsort(distances)[:5]}
+        found = {d.metadata["source"] for d in store.search(query, top_k=5)}
+        recalled += len(exact & found)
+        exact_small += len(exact & small_sources)
+        found_small += len(found & small_sources)
+
+    assert recalled / 500 >= 0.75
+    assert found_small >= exact_small / 2
+
+def test_unknown_compression_option(tmp_path, embeddings):
+    with pytest.raises(ValueError, match="Unknown index quantization"):
+        VectorStoreService(embeddings=embeddings, index_path=str(tmp_path / "x"), quantization="int4")
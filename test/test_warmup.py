@@ -0,0 +1,108 @@
+# test/test_warmup.py
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from langchain.docstore.document import Document
+from app.agents.retriever import RetrieverAgent
+from app.agents.responder import ResponderAgent
+from app.services.cache import LRUCache
+from app.services.query_log import QueryLog
+from app.services.warmup import CacheWarmer
+
+# ----- Fixtures -----
+@pytest.fixture
+def query_log(tmp_path):
+    log = QueryLog(str(tmp_path / "query_log.jsonl"))
+    for query in ["warranty?", "battery life", "warranty?", "bluetooth", "warranty?", "battery life"]:
+        log.record(query, user_id="usr_1")
+    log.flush()
+    return log
+
+@pytest.fixture
+def retriever():
+    mock = MagicMock(spec=RetrieverAgent)
+    mock.retrieve.return_value = [Document(page_content="doc", metadata={"source": "p1.txt"})]
+    return mock
+
+# ----- Unit Tests -----
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_query_log_counts_and_persists(query_log):
+    """Frequency stats survive a restart by replaying the log"""
+    assert query_log.top(2) == [("warranty?", None, 3), ("battery life", None, 2)]
+
+    reloaded = QueryLog(query_log.path)
+    assert reloaded.load() == 6
+    assert reloaded.top(1) == [("warranty?", None, 3)]
+    with open(query_log.path, encoding="utf-8") as f:
+        assert json.loads(f.readline())["user_id"] == "usr_1"
+
+@pytest.mark.asyncio
+async def test_warm_runs_top_queries(query_log, retriever):
+    responder = MagicMock(spec=ResponderAgent)
+    responder.agenerate_response = AsyncMock(return_value="answer")
+    warmer = CacheWarmer(query_log, retriever, responder)
+
+    report = await warmer.warm(top_n=2, time_budget_s=10, warm_answers=True)
+
+    assert [c.args[0] for c in retriever.retrieve.call_args_list] == ["warranty?", "battery life"]
+    assert all(c.kwargs["catalog_id"] is None for c in retriever.retrieve.call_args_list)
+    # Answers are warmed through the scheduler, behind interactive traffic
+    assert responder.agenerate_response.call_count == 2
+    assert all(c.kwargs["priority"] == "batch" for c in responder.agenerate_response.call_args_list)
+    assert report["warmed"] == 2
+    assert not report["budget_exhausted"]
+
+def test_record_does_not_write_until_flushed(tmp_path):
+    log = QueryLog(str(tmp_path / "query_log.jsonl"), flush_interval_s=0.01)
+    log.record("warranty?")
+    assert not (tmp_path / "query_log.jsonl").exists()
+
+    log.start()
+    log.record("battery life")
+    log.stop()
+
+    assert QueryLog(log.path).load() == 2
+
+@pytest.mark.asyncio
+async def test_warm_uses_the_logged_catalog(tmp_path, retriever):
+    log = QueryLog(str(tmp_path / "query_log.jsonl"))
+    log.record("warranty?", catalog_id="acme")
+    log.record("warranty?", catalog_id="acme")
+    log.record("warranty?")
+    log.flush()
+    reloaded = QueryLog(log.path)
+    reloaded.load()
+
+    await CacheWarmer(reloaded, retriever).warm(top_n=2, time_budget_s=10)
+
+    assert [c.kwargs["catalog_id"] for c in retriever.retrieve.call_args_list] == ["acme", None]
+
+@pytest.mark.asyncio
+async def test_warm_respects_time_budget(query_log, retriever):
+    warmer = CacheWarmer(query_log, retriever)
+
+    report = await warmer.warm(top_n=3, time_budget_s=0)
+
+    retriever.retrieve.assert_not_called()
+    assert report["budget_exhausted"]
+
+@pytest.mark.asyncio
+async def test_warm_continues_after_failures(query_log, retriever):
+    retriever.retrieve.side_effect = [ValueError("boom"), [], []]
+    warmer = CacheWarmer(query_log, retriever)
+
+    report = await warmer.warm(top_n=3, time_budget_s=10)
+
+    assert report["failed"] == 1
+    assert report["warmed"] == 2